@@ -14,9 +14,21 @@
 
 from __future__ import annotations
 
+import contextlib
+import datetime
 import functools
+import os
+import shutil
 import warnings
-from typing import Any, Callable, Literal
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Literal,
+    Sequence,
+    TypeVar,
+    overload,
+)
 
 import attrs
 import multiurl.base
@@ -24,7 +36,31 @@ import requests
 
 import cads_api_client
 
-from . import __version__, catalogue, config, processing, profile
+from . import (
+    __version__,
+    batch,
+    budgeting,
+    caching,
+    catalogue,
+    coalescing,
+    config,
+    costing,
+    history,
+    indexing,
+    normalization,
+    processing,
+    profile,
+    reporting,
+    singleflight,
+    sinks,
+    splitting,
+    syncing,
+    tuning,
+    validation,
+    watching,
+)
+
+T_Sink = TypeVar("T_Sink", bound=sinks.Sink)
 
 
 @attrs.define(slots=False)
@@ -42,7 +78,8 @@ class ApiClient:
     timeout: float or tuple[float,float], default: 60
         How many seconds to wait for the server to send data, as a float, or a (connect, read) tuple.
     progress: bool, default: True
-        Whether to display the progress bar during download.
+        Whether to display the progress bar during download. Batch retrievals
+        display a single line aggregating all downloads.
     cleanup: bool, default: False
         Whether to delete requests after completion.
     sleep_max: float, default: 120
@@ -53,6 +90,21 @@ class ApiClient:
         Maximum number of retries.
     session: requests.Session
         Requests session.
+    single_flight: bool, default: True
+        Whether concurrent identical retrievals share a single job and download.
+    cache_dir: str or None, default: None
+        Directory caching retrieved results, possibly shared by processes on
+        several nodes. If None, results are not cached.
+    resume_downloads: bool, default: False
+        Whether interrupted downloads are resumed, also across restarts.
+    storage_options: dict[str,Any] or None, default: None
+        fsspec options used to download to URLs (e.g., ``s3://bucket/key``).
+    disk_budget: cads_api_client.budgeting.DiskBudget or None, default: None
+        Disk space admission control: downloads wait until their size is
+        available in the target directory. If None, downloads start at once.
+    tuning_path: str or None, default: None
+        JSON file recording the range-parallel download settings tuned for
+        each host, reused across sessions. If None, keep them in memory.
     """
 
     url: str | None = None
@@ -66,6 +118,24 @@ class ApiClient:
     maximum_tries: int = 500
     session: requests.Session = attrs.field(factory=requests.Session)
     _log_callback: Callable[..., None] | None = None
+    single_flight: bool = True
+    cache_dir: str | None = None
+    resume_downloads: bool = False
+    storage_options: dict[str, Any] | None = None
+    disk_budget: budgeting.DiskBudget | None = None
+    tuning_path: str | None = None
+    _form_validators: dict[str, validation.FormValidator] = attrs.field(
+        init=False, factory=dict, repr=False
+    )
+    _cost_estimators: dict[str, costing.CostEstimator] = attrs.field(
+        init=False, factory=dict, repr=False
+    )
+    _retrievals: singleflight.SingleFlight[str] = attrs.field(
+        init=False, factory=singleflight.SingleFlight, repr=False
+    )
+    _cached_retrievals: singleflight.SingleFlight[tuple[str, dict[str, Any]]] = (
+        attrs.field(init=False, factory=singleflight.SingleFlight, repr=False)
+    )
 
     def __attrs_post_init__(self) -> None:
         if self.url is None:
@@ -104,8 +174,23 @@ class ApiClient:
         )
         return {
             "progress_bar": progress_bar,
+            "resume": self.resume_downloads,
+            "storage_options": self.storage_options or {},
+            "disk_budget": self.disk_budget,
+            "range_tuning": self._range_tuning,
         }
 
+    @functools.cached_property
+    def _range_tuning(self) -> tuning.TuningStore:
+        return tuning.TuningStore(self.tuning_path)
+
+    def _batch_progress(
+        self,
+    ) -> ContextManager[reporting.ProgressAggregator | None]:
+        if not self.progress:
+            return contextlib.nullcontext()
+        return reporting.ProgressAggregator()
+
     @property
     def _request_options(self) -> dict[str, Any]:
         return {
@@ -140,6 +225,28 @@ class ApiClient:
             f"{self.url}/retrieve", **self._get_request_kwargs()
         )
 
+    @functools.cached_property
+    def _result_cache(self) -> caching.ResultCache:
+        assert self.cache_dir is not None
+        return caching.ResultCache(self.cache_dir)
+
+    def _retrieve_to_cache(
+        self, key: str, collection_id: str, request: dict[str, Any]
+    ) -> tuple[str, dict[str, Any]]:
+        def create(path: str) -> dict[str, Any]:
+            remote = self.submit(collection_id, **request)
+            results = remote.make_results()
+            results.download(path)
+            return {
+                "filename": results.filename,
+                "collection_id": collection_id,
+                "request": normalization.normalize_request(request),
+                "request_uid": remote.request_uid,
+                "sha256": results.digests.get("sha256"),
+            }
+
+        return self._result_cache.get_or_create(key, create)
+
     @functools.cached_property
     def _profile_api(self) -> profile.Profile:
         return profile.Profile(f"{self.url}/profiles", **self._get_request_kwargs())
@@ -227,6 +334,36 @@ class ApiClient:
         """
         return self.get_process(collection_id).estimate_costs(**request)
 
+    def estimate_costs_many(
+        self,
+        collection_id: str,
+        request_list: Sequence[dict[str, Any]],
+        max_workers: int = 4,
+    ) -> costing.CostPlan:
+        """Estimate costs of many requests concurrently.
+
+        Estimates are memoized by canonical request for the lifetime of the client.
+
+        Parameters
+        ----------
+        collection_id: str
+            Collection ID (e.g., ``"projections-cmip6"``).
+        request_list: Sequence[dict[str,Any]]
+            Requests parameters.
+        max_workers: int, default: 4
+            Maximum number of concurrent cost estimations.
+
+        Returns
+        -------
+        cads_api_client.costing.CostPlan
+            Estimated costs of each request and aggregate cost.
+        """
+        if (estimator := self._cost_estimators.get(collection_id)) is None:
+            estimator = costing.CostEstimator(self.get_process(collection_id))
+            self._cost_estimators[collection_id] = estimator
+        estimator.max_workers = max_workers
+        return estimator.estimate_many(request_list)
+
     def get_accepted_licences(
         self,
         scope: Literal[None, "all", "dataset", "portal"] = None,
@@ -399,29 +536,277 @@ class ApiClient:
         """
         return self.get_remote(request_uid).make_results()
 
+    def index_collections(
+        self, path: str = ":memory:", limit: int | None = None
+    ) -> indexing.CollectionIndex:
+        """Mirror the catalogue collections into a local searchable index.
+
+        Existing indexes are refreshed incrementally: unchanged collections
+        are not rewritten and removed collections are dropped.
+
+        Parameters
+        ----------
+        path: str, default: ":memory:"
+            Path to the SQLite database.
+        limit: int | None
+            Number of collections per page.
+
+        Returns
+        -------
+        cads_api_client.indexing.CollectionIndex
+            Refreshed index, supporting full-text, keyword, bbox and time
+            extent search.
+        """
+        index = indexing.CollectionIndex(path)
+        index.refresh(self.get_collections(limit=limit))
+        return index
+
+    def normalize_request(self, collection_id: str, **request: Any) -> dict[str, Any]:
+        """Canonicalize a request.
+
+        Parameters
+        ----------
+        collection_id: str
+            Collection ID (e.g., ``"projections-cmip6"``).
+        **request: Any
+            Request parameters.
+
+        Returns
+        -------
+        dict[str,Any]
+            Canonical request.
+        """
+        return self.get_process(collection_id).normalize_request(**request)
+
+    def request_digest(self, collection_id: str, **request: Any) -> str:
+        """Compute a stable digest of a request.
+
+        Parameters
+        ----------
+        collection_id: str
+            Collection ID (e.g., ``"projections-cmip6"``).
+        **request: Any
+            Request parameters.
+
+        Returns
+        -------
+        str
+            Hexadecimal digest.
+        """
+        return self.get_process(collection_id).request_digest(**request)
+
+    @overload
+    def retrieve(
+        self, collection_id: str, target: str | None = None, **request: Any
+    ) -> str: ...
+
+    @overload
+    def retrieve(
+        self, collection_id: str, target: T_Sink, **request: Any
+    ) -> T_Sink: ...
+
     def retrieve(
         self,
         collection_id: str,
-        target: str | None = None,
+        target: str | sinks.Sink | None = None,
         **request: Any,
-    ) -> str:
+    ) -> str | sinks.Sink:
         """Submit a request and retrieve the results.
 
+        Concurrent identical retrievals share the same job and downloaded file
+        (see ``single_flight``). If ``cache_dir`` is set, results are cached and
+        exactly one process submits and downloads each request.
+
         Parameters
         ----------
         collection_id: str
             Collection ID (e.g., ``"projections-cmip6"``).
-        target: str or None
-            Target path. If None, download to the working directory.
+        target: str, cads_api_client.sinks.Sink or None
+            Target path or URL (e.g., ``s3://bucket/key``, see
+            ``storage_options``), or sink such as ``io.BytesIO()`` written
+            without touching the disk. If None, download to the working
+            directory.
         **request: Any
             Request parameters.
 
         Returns
         -------
-        str
-            Path to the retrieved file.
+        str or cads_api_client.sinks.Sink
+            Path or URL of the retrieved file, or the sink.
         """
-        return self.submit(collection_id, **request).download(target)
+        key = normalization.request_digest(request, collection_id)
+        if self.cache_dir is not None:
+            (path, metadata), _ = self._cached_retrievals.do(
+                key, self._retrieve_to_cache, key, collection_id, request
+            )
+            if isinstance(target, sinks.Sink):
+                with open(path, "rb") as fp:
+                    shutil.copyfileobj(fp, target)
+                return target
+            target = metadata["filename"] if target is None else target
+            sinks.copy_file(path, target, **(self.storage_options or {}))
+            return target
+
+        if isinstance(target, sinks.Sink):
+            results = self.submit(collection_id, **request).make_results()
+            results.download_to(target)
+            return target
+
+        if not self.single_flight or (target is not None and sinks.is_url(target)):
+            return self.submit(collection_id, **request).download(target)
+
+        path, shared = self._retrievals.do(
+            key, lambda: self.submit(collection_id, **request).download(target)
+        )
+        if (
+            shared
+            and target is not None
+            and os.path.abspath(target) != os.path.abspath(path)
+        ):
+            shutil.copyfile(path, target)
+            return target
+        return path
+
+    def retrieve_coalesced(
+        self,
+        collection_id: str,
+        request_list: Sequence[dict[str, Any]],
+        target_dir: str | None = None,
+        max_workers: int = 4,
+    ) -> list[batch.ManifestEntry]:
+        """Merge compatible requests into fewer jobs and retrieve the results.
+
+        Parameters
+        ----------
+        collection_id: str
+            Collection ID (e.g., ``"projections-cmip6"``).
+        request_list: Sequence[dict[str,Any]]
+            Requests parameters.
+        target_dir: str or None
+            Target directory. If None, download to the working directory.
+        max_workers: int, default: 4
+            Maximum number of jobs processed concurrently.
+
+        Returns
+        -------
+        list[cads_api_client.batch.ManifestEntry]
+            One entry per request, pointing to the file of the merged job.
+        """
+        coalescer = coalescing.RequestCoalescer(
+            self.get_process(collection_id),
+            target_dir=target_dir,
+            max_workers=max_workers,
+        )
+        futures = [coalescer.submit(**request) for request in request_list]
+        coalescer.flush()
+        return [future.result() for future in futures]
+
+    def retrieve_many(
+        self,
+        collection_id: str,
+        request_list: Sequence[dict[str, Any]],
+        target_dir: str | None = None,
+        max_workers: int = 4,
+        postprocess: Callable[[str], Any] | None = None,
+        postprocess_workers: int | None = None,
+    ) -> list[batch.ManifestEntry]:
+        """Submit many requests and retrieve the results concurrently.
+
+        Parameters
+        ----------
+        collection_id: str
+            Collection ID (e.g., ``"projections-cmip6"``).
+        request_list: Sequence[dict[str,Any]]
+            Requests parameters.
+        target_dir: str or None
+            Target directory. If None, download to the working directory.
+        max_workers: int, default: 4
+            Maximum number of requests processed concurrently.
+        postprocess: Callable[[str],Any] or None
+            Picklable function called with the path of each downloaded file
+            in a process pool, overlapping with the downloads.
+        postprocess_workers: int or None
+            Number of processes postprocessing files. If None, use the number
+            of CPUs.
+
+        Returns
+        -------
+        list[cads_api_client.batch.ManifestEntry]
+            Requests, request UIDs, paths to the retrieved files, outputs of
+            the postprocessing and timings of each stage.
+        """
+        with self._batch_progress() as progress:
+            return batch.retrieve_many(
+                self.get_process(collection_id),
+                request_list,
+                target_dir=target_dir,
+                max_workers=max_workers,
+                progress=progress,
+                postprocess=postprocess,
+                postprocess_workers=postprocess_workers,
+            )
+
+    def retrieve_split(
+        self,
+        collection_id: str,
+        target_dir: str | None = None,
+        max_workers: int = 4,
+        **request: Any,
+    ) -> list[batch.ManifestEntry]:
+        """Split a request within the cost limit and retrieve the pieces concurrently.
+
+        Parameters
+        ----------
+        collection_id: str
+            Collection ID (e.g., ``"projections-cmip6"``).
+        target_dir: str or None
+            Target directory. If None, download to the working directory.
+        max_workers: int, default: 4
+            Maximum number of concurrent cost estimations and retrievals.
+        **request: Any
+            Request parameters.
+
+        Returns
+        -------
+        list[cads_api_client.batch.ManifestEntry]
+            Requests, request UIDs and paths to the retrieved files.
+        """
+        process = self.get_process(collection_id)
+        pieces = splitting.RequestSplitter(process, max_workers=max_workers).split(
+            **request
+        )
+        with self._batch_progress() as progress:
+            return batch.retrieve_many(
+                process,
+                pieces,
+                target_dir=target_dir,
+                max_workers=max_workers,
+                progress=progress,
+            )
+
+    def split_request(
+        self, collection_id: str, max_workers: int = 4, **request: Any
+    ) -> list[dict[str, Any]]:
+        """Split a request into pieces within the cost limit.
+
+        Parameters
+        ----------
+        collection_id: str
+            Collection ID (e.g., ``"projections-cmip6"``).
+        max_workers: int, default: 4
+            Maximum number of concurrent cost estimations.
+        **request: Any
+            Request parameters.
+
+        Returns
+        -------
+        list[dict[str,Any]]
+            Requests within the cost limit.
+        """
+        process = self.get_process(collection_id)
+        return splitting.RequestSplitter(process, max_workers=max_workers).split(
+            **request
+        )
 
     def submit(self, collection_id: str, **request: Any) -> cads_api_client.Remote:
         """Submit a request.
@@ -456,3 +841,129 @@ class ApiClient:
         cads_api_client.Results
         """
         return self._retrieve_api.submit(collection_id, **request).make_results()
+
+    def sync(
+        self,
+        collection_id: str,
+        target_dir: str,
+        state_path: str | None = None,
+        start: datetime.date | None = None,
+        max_workers: int = 4,
+        **request: Any,
+    ) -> list[batch.ManifestEntry]:
+        """Retrieve the dates of a growing time series not retrieved yet.
+
+        Parameters
+        ----------
+        collection_id: str
+            Collection ID (e.g., ``"reanalysis-era5-single-levels"``).
+        target_dir: str
+            Target directory.
+        state_path: str or None
+            Path to the file recording the dates retrieved.
+            If None, use a file in ``target_dir``.
+        start: datetime.date or None
+            First date to retrieve. If None, use the start of ``date`` or the
+            begin datetime of the collection.
+        max_workers: int, default: 4
+            Maximum number of requests processed concurrently.
+        **request: Any
+            Base request parameters.
+
+        Returns
+        -------
+        list[cads_api_client.batch.ManifestEntry]
+            Manifest entries of the requests submitted.
+        """
+        return syncing.DeltaSync(
+            self.get_collection(collection_id),
+            request,
+            target_dir,
+            state_path=state_path,
+            start=start,
+            max_workers=max_workers,
+        ).sync()
+
+    def sync_jobs(
+        self,
+        path: str = ":memory:",
+        limit: int | None = None,
+        fetch_requests: bool = False,
+    ) -> history.JobHistory:
+        """Mirror the job history into a local database.
+
+        Only jobs created since the last sync are listed, and jobs that were
+        accepted or running are refreshed.
+
+        Parameters
+        ----------
+        path: str, default: ":memory:"
+            Path to the SQLite database.
+        limit: int or None
+            Number of jobs per page.
+        fetch_requests: bool, default: False
+            Whether to fetch the requests missing from the job listing, so
+            that jobs can be looked up by request.
+
+        Returns
+        -------
+        cads_api_client.history.JobHistory
+            Local job history.
+        """
+        job_history = history.JobHistory(path)
+        job_history.sync(self._retrieve_api, limit=limit, fetch_requests=fetch_requests)
+        return job_history
+
+    def validate_request(self, collection_id: str, **request: Any) -> None:
+        """Validate a request locally against the form of a collection.
+
+        The form is downloaded only once per collection.
+
+        Parameters
+        ----------
+        collection_id: str
+            Collection ID (e.g., ``"projections-cmip6"``).
+        **request: Any
+            Request parameters.
+
+        Raises
+        ------
+        cads_api_client.validation.InvalidRequestError
+            If the request is not valid.
+        """
+        if (validator := self._form_validators.get(collection_id)) is None:
+            validator = self.get_collection(collection_id).form_validator
+            self._form_validators[collection_id] = validator
+        validator.check(**request)
+
+    def watch_collections(
+        self,
+        collection_ids: Sequence[str],
+        callback: Callable[[cads_api_client.Collection], None] | None = None,
+        interval: float = 600,
+    ) -> watching.CatalogueWatcher:
+        """Create a watcher firing callbacks when catalogue collections are updated.
+
+        Collections are polled with conditional requests. Callbacks can,
+        for example, retrieve the new data with ``sync``.
+
+        Parameters
+        ----------
+        collection_ids: Sequence[str]
+            IDs of the collections to watch.
+        callback: Callable[[cads_api_client.Collection],None] or None
+            Function called with each updated collection.
+        interval: float, default: 600
+            Seconds between polls.
+
+        Returns
+        -------
+        cads_api_client.watching.CatalogueWatcher
+            Watcher, to be started with ``.start()`` or polled with ``.poll()``.
+        """
+        watcher = watching.CatalogueWatcher(
+            self._catalogue_api, collection_ids, interval=interval
+        )
+        if callback is not None:
+            watcher.add_callback(callback)
+        return watcher
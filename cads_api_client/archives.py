@@ -0,0 +1,87 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import zipfile
+from typing import IO, Sequence
+
+import attrs
+
+
+@attrs.define(frozen=True)
+class ZipMember:
+    """Member of a zip archive.
+
+    Parameters
+    ----------
+    name: str
+        Path of the member in the archive.
+    size: int
+        Uncompressed size in Bytes.
+    compressed_size: int
+        Compressed size in Bytes.
+    """
+
+    name: str
+    size: int
+    compressed_size: int
+
+
+def list_zip_members(fp: IO[bytes]) -> list[ZipMember]:
+    """List the files in a zip archive, reading only its central directory.
+
+    Parameters
+    ----------
+    fp: IO[bytes]
+        Seekable binary file object.
+
+    Returns
+    -------
+    list[ZipMember]
+        Members of the archive, directories excluded.
+    """
+    with zipfile.ZipFile(fp) as archive:
+        return [
+            ZipMember(info.filename, info.file_size, info.compress_size)
+            for info in archive.infolist()
+            if not info.is_dir()
+        ]
+
+
+def extract_zip_members(
+    fp: IO[bytes], target_dir: str, members: Sequence[str] | None = None
+) -> list[str]:
+    """Extract files from a zip archive, decompressing them while reading.
+
+    Parameters
+    ----------
+    fp: IO[bytes]
+        Seekable binary file object.
+    target_dir: str
+        Target directory.
+    members: Sequence[str] or None
+        Names of the members to extract. If None, extract all files.
+
+    Returns
+    -------
+    list[str]
+        Paths to the extracted files.
+    """
+    with zipfile.ZipFile(fp) as archive:
+        if members is None:
+            members = [
+                info.filename for info in archive.infolist() if not info.is_dir()
+            ]
+        return [archive.extract(member, target_dir) for member in members]
@@ -0,0 +1,217 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Any, Callable, Sequence
+
+import attrs
+
+from . import processing, reporting
+
+
+@attrs.define(frozen=True)
+class ManifestEntry:
+    """A request processed in a batch.
+
+    Parameters
+    ----------
+    request: dict[str,Any]
+        Request parameters.
+    request_uid: str or None
+        Request UID. None if the submission failed.
+    target: str or None
+        Path to the retrieved file. None if the retrieval failed.
+    error: Exception or None
+        Error raised while processing the request, if any.
+    output: Any
+        Value returned by the postprocessing of the file, if any.
+    timings: dict[str,float]
+        Time spent (in seconds) in each stage (``"processing"``,
+        ``"download"`` and ``"postprocess"``).
+    """
+
+    request: dict[str, Any]
+    request_uid: str | None = None
+    target: str | None = None
+    error: Exception | None = attrs.field(default=None, eq=False)
+    output: Any = attrs.field(default=None, eq=False)
+    timings: dict[str, float] = attrs.field(factory=dict, eq=False)
+
+    @property
+    def ok(self) -> bool:
+        """Whether the request was retrieved successfully."""
+        return self.error is None
+
+
+def retrieve_one(
+    process: processing.Process,
+    request: dict[str, Any],
+    target_dir: str | None = None,
+    progress: reporting.JobProgress | None = None,
+) -> ManifestEntry:
+    """Submit a request and retrieve the results.
+
+    Parameters
+    ----------
+    process: cads_api_client.Process
+        Process to submit the request to.
+    request: dict[str,Any]
+        Request parameters.
+    target_dir: str or None
+        Target directory. If None, download to the working directory.
+        The file name is prefixed with the request UID, so that requests
+        with identical results never overwrite each other.
+    progress: cads_api_client.reporting.JobProgress or None
+        Progress of the job, also reporting the download progress.
+
+    Returns
+    -------
+    ManifestEntry
+        Manifest entry. Errors are recorded rather than raised.
+    """
+    request_uid = None
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    try:
+        if progress is not None:
+            progress.set_state("processing")
+        remote = process.submit(**request)
+        request_uid = remote.request_uid
+        results = remote.make_results()
+        timings["processing"] = time.perf_counter() - started
+        started = time.perf_counter()
+        if progress is not None:
+            progress.set_state("downloading")
+            download_options = {
+                **results.download_options,
+                "progress_bar": progress.progress_bar,
+            }
+            results = attrs.evolve(results, download_options=download_options)
+        target = None
+        if target_dir is not None:
+            target = os.path.join(target_dir, f"{request_uid}-{results.filename}")
+        target = results.download(target)
+        timings["download"] = time.perf_counter() - started
+    except Exception as exc:
+        if progress is not None:
+            progress.set_state("failed")
+        return ManifestEntry(
+            request=request, request_uid=request_uid, error=exc, timings=timings
+        )
+    if progress is not None:
+        progress.set_state("done")
+    return ManifestEntry(
+        request=request, request_uid=request_uid, target=target, timings=timings
+    )
+
+
+def _timed(func: Callable[[str], Any], path: str) -> tuple[Any, float]:
+    started = time.perf_counter()
+    output = func(path)
+    return output, time.perf_counter() - started
+
+
+def _postprocessed(
+    entry: ManifestEntry, future: concurrent.futures.Future[tuple[Any, float]] | None
+) -> ManifestEntry:
+    if future is None:
+        return entry
+    try:
+        output, elapsed = future.result()
+    except Exception as exc:
+        return attrs.evolve(entry, error=exc)
+    timings = {**entry.timings, "postprocess": elapsed}
+    return attrs.evolve(entry, output=output, timings=timings)
+
+
+def retrieve_many(
+    process: processing.Process,
+    request_list: Sequence[dict[str, Any]],
+    target_dir: str | None = None,
+    max_workers: int = 4,
+    progress: reporting.ProgressAggregator | None = None,
+    postprocess: Callable[[str], Any] | None = None,
+    postprocess_workers: int | None = None,
+    max_pending: int | None = None,
+) -> list[ManifestEntry]:
+    """Submit many requests and retrieve the results concurrently.
+
+    Parameters
+    ----------
+    process: cads_api_client.Process
+        Process to submit the requests to.
+    request_list: Sequence[dict[str,Any]]
+        Requests parameters.
+    target_dir: str or None
+        Target directory. If None, download to the working directory.
+    max_workers: int, default: 4
+        Maximum number of requests processed concurrently.
+    progress: cads_api_client.reporting.ProgressAggregator or None
+        Aggregator reporting the progress of the whole batch, replacing the
+        progress bars of the downloads. If None, use the download options.
+    postprocess: Callable[[str],Any] or None
+        Picklable function called with the path of each downloaded file
+        (e.g., to convert or compress it) in a process pool, while the
+        following downloads go on. Its return value is recorded in ``output``.
+    postprocess_workers: int or None
+        Number of processes postprocessing files. If None, use the number of
+        CPUs.
+    max_pending: int or None
+        Maximum number of files waiting to be postprocessed. Downloads pause
+        when reached. If None, twice the number of processes.
+
+    Returns
+    -------
+    list[ManifestEntry]
+        Manifest entries, in the order of the requests. Failed requests
+        do not interrupt the batch, their entries carry the error.
+    """
+    if target_dir is not None:
+        os.makedirs(target_dir, exist_ok=True)
+    jobs = [None if progress is None else progress.add_job() for _ in request_list]
+    if postprocess is None:
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            futures = [
+                executor.submit(retrieve_one, process, request, target_dir, job)
+                for request, job in zip(request_list, jobs)
+            ]
+            return [future.result() for future in futures]
+
+    postprocess_workers = postprocess_workers or os.cpu_count() or 1
+    pending = threading.BoundedSemaphore(max_pending or 2 * postprocess_workers)
+
+    with concurrent.futures.ProcessPoolExecutor(postprocess_workers) as pool:
+
+        def retrieve_and_dispatch(
+            request: dict[str, Any], job: reporting.JobProgress | None
+        ) -> tuple[ManifestEntry, concurrent.futures.Future[tuple[Any, float]] | None]:
+            entry = retrieve_one(process, request, target_dir, job)
+            if not entry.ok or entry.target is None:
+                return entry, None
+            pending.acquire()
+            future = pool.submit(_timed, postprocess, entry.target)
+            future.add_done_callback(lambda _: pending.release())
+            return entry, future
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            dispatched = [
+                executor.submit(retrieve_and_dispatch, request, job)
+                for request, job in zip(request_list, jobs)
+            ]
+            return [_postprocessed(*future.result()) for future in dispatched]
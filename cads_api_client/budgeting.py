@@ -0,0 +1,122 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import logging
+import os
+import shutil
+import threading
+from typing import Iterator, Mapping
+
+import attrs
+
+LOGGER = logging.getLogger(__name__)
+
+
+class DiskBudgetError(RuntimeError):
+    pass
+
+
+@attrs.define(slots=False)
+class DiskBudget:
+    """Admission control of downloads against the disk space of directories.
+
+    Downloads reserve their size in the target directory before starting,
+    and wait while the reservations in flight exceed the free space (minus
+    ``min_free``) or the budget of the directory. Space reserved by
+    completed downloads stays spent; failed downloads release it.
+
+    Parameters
+    ----------
+    budget: int, Mapping[str,int] or None
+        Maximum number of Bytes downloaded to each directory, or by
+        directory. If None, only the free space is checked.
+    min_free: int
+        Number of Bytes to keep free in each directory.
+    poll_interval: float
+        Time to wait (in seconds) before checking the free space again.
+    """
+
+    budget: int | Mapping[str, int] | None = None
+    min_free: int = 0
+    poll_interval: float = 10
+
+    def __attrs_post_init__(self) -> None:
+        self._condition = threading.Condition()
+        self._reserved: collections.Counter[str] = collections.Counter()
+        self._spent: collections.Counter[str] = collections.Counter()
+
+    def get_budget(self, directory: str) -> int | None:
+        if isinstance(self.budget, Mapping):
+            for path, budget in self.budget.items():
+                if os.path.abspath(path) == directory:
+                    return budget
+            return None
+        return self.budget
+
+    def free_space(self, directory: str) -> int:
+        return shutil.disk_usage(directory).free
+
+    def available(self, directory: str) -> int:
+        """Return the number of Bytes that can be reserved in a directory."""
+        directory = os.path.abspath(directory)
+        with self._condition:
+            return self._available(directory)
+
+    def _available(self, directory: str) -> int:
+        # call with the lock held
+        reserved = self._reserved[directory]
+        available = self.free_space(directory) - self.min_free - reserved
+        if (budget := self.get_budget(directory)) is not None:
+            available = min(available, budget - self._spent[directory] - reserved)
+        return available
+
+    def acquire(self, directory: str, size: int) -> None:
+        """Reserve space in a directory, waiting until it is available."""
+        directory = os.path.abspath(directory)
+        with self._condition:
+            while self._available(directory) < size:
+                budget = self.get_budget(directory)
+                if budget is not None and self._spent[directory] + size > budget:
+                    raise DiskBudgetError(
+                        f"Disk budget of {directory} exhausted: {size} byte(s) requested,"
+                        f" {budget - self._spent[directory]} left"
+                    )
+                LOGGER.info(f"Waiting for {size} byte(s) of disk space in {directory}")
+                self._condition.wait(self.poll_interval)
+            self._reserved[directory] += size
+
+    def release(self, directory: str, size: int, spent: bool = True) -> None:
+        """Release a reservation, accounting for the space spent if successful."""
+        directory = os.path.abspath(directory)
+        with self._condition:
+            self._reserved[directory] -= size
+            if spent:
+                self._spent[directory] += size
+            self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def reserve(self, target: str, size: int) -> Iterator[None]:
+        """Reserve space for a file while it is downloaded."""
+        directory = os.path.dirname(os.path.abspath(target))
+        self.acquire(directory, size)
+        spent = False
+        try:
+            yield
+            spent = True
+        finally:
+            self.release(directory, size, spent=spent)
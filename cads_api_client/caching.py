@@ -0,0 +1,209 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Iterator
+
+import attrs
+
+LOGGER = logging.getLogger(__name__)
+
+
+@attrs.define(slots=False)
+class FileLock:
+    """Lock file with owner, heartbeat and stale-lock takeover.
+
+    The lock is a file created atomically, holding the owner (host, PID and a
+    unique token). While held, its modification time is refreshed by a
+    heartbeat thread. Locks whose heartbeat is older than ``stale_after``
+    are taken over by renaming them away, which only one process can do.
+    """
+
+    path: str
+    stale_after: float = 60
+    heartbeat_interval: float = 10
+
+    def __attrs_post_init__(self) -> None:
+        self.token = uuid.uuid4().hex
+        self._stop = threading.Event()
+        self._heartbeat: threading.Thread | None = None
+
+    @property
+    def owner(self) -> dict[str, Any]:
+        return {
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "token": self.token,
+            "created": time.time(),
+        }
+
+    def read_owner(self) -> dict[str, Any] | None:
+        try:
+            with open(self.path) as fp:
+                owner = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        return owner if isinstance(owner, dict) else None
+
+    def is_stale(self) -> bool:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except FileNotFoundError:
+            return False
+        return time.time() - mtime > self.stale_after
+
+    def _break_stale(self) -> None:
+        stale_path = f"{self.path}.stale-{self.token}"
+        try:
+            os.rename(self.path, stale_path)
+        except FileNotFoundError:
+            return
+        LOGGER.warning(f"taking over stale lock {self.path}")
+        os.remove(stale_path)
+
+    def acquire(self) -> bool:
+        """Try to acquire the lock without blocking."""
+        if self.is_stale():
+            self._break_stale()
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as fp:
+            json.dump(self.owner, fp)
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._beat, daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.heartbeat_interval):
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(self.path)
+
+    def release(self) -> None:
+        """Release the lock, if still owned."""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        owner = self.read_owner()
+        if owner is not None and owner.get("token") == self.token:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.path)
+
+
+@attrs.define(slots=False)
+class ResultCache:
+    """Result cache on a (possibly shared) directory.
+
+    Exactly one process creates a missing entry, while the others wait for
+    the lock to be released and pick up the finished file.
+
+    Parameters
+    ----------
+    cache_dir: str
+        Cache directory.
+    stale_after: float
+        Seconds without heartbeat after which a lock is considered stale.
+    heartbeat_interval: float
+        Seconds between heartbeats of the lock owner.
+    poll_interval: float
+        Seconds between checks while waiting for another owner.
+    """
+
+    cache_dir: str
+    stale_after: float = 60
+    heartbeat_interval: float = 10
+    poll_interval: float = 1
+
+    def __attrs_post_init__(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, key: str) -> tuple[str, dict[str, Any]] | None:
+        """Return the path and metadata of a cached entry, if any."""
+        try:
+            with open(f"{self._path(key)}.json") as fp:
+                metadata = json.load(fp)
+        except FileNotFoundError:
+            return None
+        if not os.path.exists(path := self._path(key)):
+            return None
+        return path, metadata
+
+    @contextlib.contextmanager
+    def _locked(self, key: str) -> Iterator[FileLock | None]:
+        lock = FileLock(
+            f"{self._path(key)}.lock",
+            stale_after=self.stale_after,
+            heartbeat_interval=self.heartbeat_interval,
+        )
+        if not lock.acquire():
+            yield None
+            return
+        try:
+            yield lock
+        finally:
+            lock.release()
+
+    def get_or_create(
+        self, key: str, create: Callable[[str], dict[str, Any]]
+    ) -> tuple[str, dict[str, Any]]:
+        """Return a cached entry, creating it if missing.
+
+        Parameters
+        ----------
+        key: str
+            Cache key (e.g., a request digest).
+        create: Callable[[str], dict[str,Any]]
+            Function writing the entry to the path provided and returning
+            its metadata.
+
+        Returns
+        -------
+        tuple[str,dict[str,Any]]
+            Path and metadata of the cached entry.
+        """
+        while True:
+            if (entry := self.lookup(key)) is not None:
+                return entry
+            with self._locked(key) as lock:
+                if lock is not None:
+                    if (entry := self.lookup(key)) is not None:
+                        return entry
+                    partial = f"{self._path(key)}.partial-{lock.token}"
+                    try:
+                        metadata = create(partial)
+                        os.replace(partial, self._path(key))
+                    finally:
+                        with contextlib.suppress(FileNotFoundError):
+                            os.remove(partial)
+                    metadata_partial = f"{self._path(key)}.json.partial-{lock.token}"
+                    with open(metadata_partial, "w") as fp:
+                        json.dump(metadata, fp)
+                    os.replace(metadata_partial, f"{self._path(key)}.json")
+                    return self._path(key), metadata
+            time.sleep(self.poll_interval)
@@ -15,22 +15,28 @@
 from __future__ import annotations
 
 import datetime
+import functools
 import warnings
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Callable
 
 import attrs
 import requests
 
 import cads_api_client
 
-from . import config
+from . import config, validation
 from .processing import ApiResponse, ApiResponsePaginated, RequestKwargs
 
+if TYPE_CHECKING:
+    from .constraints import ConstraintsValidator
+
 
 @attrs.define
 class Collections(ApiResponsePaginated):
     """A class to interact with catalogue collections."""
 
+    _items_key = "collections"
+
     @property
     def collection_ids(self) -> list[str]:
         """List of collection IDs."""
@@ -55,6 +61,13 @@ class Collection(ApiResponse):
             return value
         return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
 
+    @property
+    def updated_datetime(self) -> datetime.datetime | None:
+        """Last update datetime of the collection."""
+        if (value := self._json_dict.get("updated")) is None:
+            return value
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
     @property
     def bbox(self) -> tuple[float, float, float, float]:
         """Bounding box of the collection (W, S, E, N)."""
@@ -87,6 +100,21 @@ class Collection(ApiResponse):
             "get", url, log_messages=False, **self._request_kwargs
         )._json_list
 
+    @functools.cached_property
+    def constraints_validator(self) -> ConstraintsValidator:
+        """Vectorized validator compiled from the constraints JSON.
+
+        Requires NumPy (``constraints`` extra).
+        """
+        from .constraints import ConstraintsValidator
+
+        return ConstraintsValidator(self.constraints)
+
+    @functools.cached_property
+    def form_validator(self) -> validation.FormValidator:
+        """Local validator compiled from the form JSON."""
+        return validation.FormValidator(self.form)
+
     def submit(self, **request: Any) -> cads_api_client.Remote:
         warnings.warn(
             "`.submit` has been deprecated, and in the future will raise an error."
@@ -136,6 +164,28 @@ class Catalogue:
         url = f"{self.url}/collections/{collection_id}"
         return Collection.from_request("get", url, **self._request_kwargs)
 
+    def get_collection_if_modified(
+        self,
+        collection_id: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> Collection | None:
+        url = f"{self.url}/collections/{collection_id}"
+        request_kwargs = self._request_kwargs
+        request_kwargs["headers"] = dict(self.headers)
+        if etag is not None:
+            request_kwargs["headers"]["If-None-Match"] = etag
+        if last_modified is not None:
+            request_kwargs["headers"]["If-Modified-Since"] = last_modified
+        collection = Collection.from_request(
+            "get", url, log_messages=False, **request_kwargs
+        )
+        if collection.response.status_code == 304:
+            return None
+        collection.headers = self.headers
+        collection.log_messages()
+        return collection
+
     def get_licenses(self, **params: Any) -> dict[str, Any]:
         url = f"{self.url}/vocabularies/licences"
         response = ApiResponse.from_request(
@@ -0,0 +1,168 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import concurrent.futures
+import json
+import threading
+from typing import Any, Sequence
+
+import attrs
+
+from . import batch, normalization, processing, splitting
+
+
+def _as_list(value: Any) -> list[Any]:
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _value_key(key: str, value: Any) -> str:
+    return json.dumps(normalization.normalize_value(key, value), sort_keys=True)
+
+
+def _same_values(key: str, left: Any, right: Any) -> bool:
+    return normalization.normalize_request({key: left}) == (
+        normalization.normalize_request({key: right})
+    )
+
+
+@attrs.define(slots=False)
+class MergedRequest:
+    request: dict[str, Any]
+    key: str | None = None
+    futures: list[concurrent.futures.Future[batch.ManifestEntry]] = attrs.field(
+        factory=list
+    )
+    originals: list[dict[str, Any]] = attrs.field(factory=list)
+
+    def merge_key(
+        self, request: dict[str, Any], merge_keys: Sequence[str]
+    ) -> str | None:
+        """Return the key to merge along, or None if the request is not compatible."""
+        if set(request) != set(self.request):
+            return None
+        different = [
+            key
+            for key in request
+            if not _same_values(key, request[key], self.request[key])
+        ]
+        if not different:
+            return self.key or ""
+        if len(different) > 1 or different[0] not in merge_keys:
+            return None
+        if self.key is not None and self.key != different[0]:
+            return None
+        return different[0]
+
+    def merged(self, request: dict[str, Any], key: str) -> dict[str, Any]:
+        if not key:
+            return self.request
+        values = _as_list(self.request[key])
+        seen = {_value_key(key, value) for value in values}
+        values += [
+            value
+            for value in _as_list(request[key])
+            if _value_key(key, value) not in seen
+        ]
+        return {**self.request, key: values}
+
+
+@attrs.define(slots=False)
+class RequestCoalescer:
+    """Merge compatible small requests into fewer jobs.
+
+    Requests are compatible if they are identical except for the values of
+    one of the merge keys. Merged requests must fit the cost limit of the
+    process. Each caller receives the manifest entry of the merged job, whose
+    file contains the data of the original request (and possibly more).
+
+    Parameters
+    ----------
+    process: cads_api_client.Process
+        Process to submit the requests to.
+    target_dir: str or None
+        Target directory. If None, download to the working directory.
+    max_workers: int
+        Maximum number of jobs processed concurrently.
+    merge_keys: Sequence[str]
+        Keys that can be merged.
+    """
+
+    process: processing.Process
+    target_dir: str | None = None
+    max_workers: int = 4
+    merge_keys: Sequence[str] = splitting.SPLIT_KEYS
+
+    def __attrs_post_init__(self) -> None:
+        self._splitter = splitting.RequestSplitter(
+            self.process, max_workers=self.max_workers
+        )
+        self._pending: list[MergedRequest] = []
+        self._lock = threading.Lock()
+
+    def submit(self, **request: Any) -> concurrent.futures.Future[batch.ManifestEntry]:
+        """Queue a request until the next flush.
+
+        Parameters
+        ----------
+        **request: Any
+            Request parameters.
+
+        Returns
+        -------
+        concurrent.futures.Future[cads_api_client.batch.ManifestEntry]
+            Future resolved with the manifest entry of the merged job.
+        """
+        future: concurrent.futures.Future[batch.ManifestEntry]
+        future = concurrent.futures.Future()
+        with self._lock:
+            for group in self._pending:
+                if (key := group.merge_key(request, self.merge_keys)) is None:
+                    continue
+                merged = group.merged(request, key)
+                if merged is not group.request and not self._splitter.fits(**merged):
+                    continue
+                group.request = merged
+                group.key = key or group.key
+                break
+            else:
+                group = MergedRequest(dict(request))
+                self._pending.append(group)
+            group.futures.append(future)
+            group.originals.append(dict(request))
+        return future
+
+    def flush(self) -> list[batch.ManifestEntry]:
+        """Submit the merged requests and resolve the futures of their callers.
+
+        Returns
+        -------
+        list[cads_api_client.batch.ManifestEntry]
+            Manifest entries of the merged jobs.
+        """
+        with self._lock:
+            groups, self._pending = self._pending, []
+        entries = batch.retrieve_many(
+            self.process,
+            [group.request for group in groups],
+            target_dir=self.target_dir,
+            max_workers=self.max_workers,
+        )
+        for group, entry in zip(groups, entries):
+            for future, original in zip(group.futures, group.originals):
+                future.set_result(attrs.evolve(entry, request=original))
+        return entries
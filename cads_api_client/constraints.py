@@ -0,0 +1,170 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from typing import Any, Iterator, Sequence
+
+import attrs
+import numpy as np
+import numpy.typing as npt
+
+
+def _as_list(value: Any) -> list[Any]:
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+@attrs.define
+class ConstraintsValidator:
+    """Vectorized validation of requests against collection constraints.
+
+    Each constraint entry is encoded as one row of an integer-coded boolean
+    array per axis, so that whole grids or batches of requests are checked with
+    array operations instead of per-request Python loops.
+
+    A combination of values is valid if at least one constraint entry allows
+    all of its values. Axes not listed in a constraint entry are not restricted
+    by that entry, and all combinations are valid if there are no constraints.
+
+    Parameters
+    ----------
+    constraints: list[dict[str,Any]]
+        Constraints JSON (see ``cads_api_client.Collection.constraints``).
+    """
+
+    constraints: list[dict[str, Any]]
+
+    def _encode_axis(self, name: str, values: Sequence[Any]) -> npt.NDArray[np.bool_]:
+        codes: dict[str, list[int]] = {}
+        for code, value in enumerate(values):
+            codes.setdefault(str(value), []).append(code)
+        allowed = np.zeros((len(self.constraints), len(values)), dtype=bool)
+        for row, constraint in enumerate(self.constraints):
+            if name not in constraint:
+                allowed[row, :] = True
+                continue
+            for value in _as_list(constraint[name]):
+                allowed[row, codes.get(str(value), [])] = True
+        return allowed
+
+    def grid_mask(self, **axes: Sequence[Any]) -> npt.NDArray[np.bool_]:
+        """Check all combinations of the values of a request grid.
+
+        Parameters
+        ----------
+        **axes: Sequence[Any]
+            Values of each request parameter (e.g., ``year=["2020", "2021"]``).
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean mask with one dimension per axis, in keyword order.
+        """
+        shape = tuple(len(values) for values in axes.values())
+        if not self.constraints:
+            return np.ones(shape, dtype=bool)
+        mask = np.zeros(shape, dtype=bool)
+        encoded = [self._encode_axis(name, values) for name, values in axes.items()]
+        for row in range(len(self.constraints)):
+            row_mask = np.ones(shape, dtype=bool)
+            for dim, allowed in enumerate(encoded):
+                index_shape = [1] * len(shape)
+                index_shape[dim] = -1
+                row_mask &= allowed[row].reshape(index_shape)
+            mask |= row_mask
+        return mask
+
+    def requests_mask(
+        self, requests: Sequence[dict[str, Any]]
+    ) -> npt.NDArray[np.bool_]:
+        """Check a batch of requests with one value per parameter.
+
+        Parameters
+        ----------
+        requests: Sequence[dict[str,Any]]
+            Requests to check. All requests must have the same parameters.
+            Values can be scalars or one-element lists.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean mask with one element per request.
+
+        Raises
+        ------
+        ValueError
+            If requests have different parameters or multiple values.
+        """
+        names = set(requests[0]) if requests else set()
+        for request in requests:
+            if set(request) != names:
+                raise ValueError(
+                    f"all requests must have the same parameters: {sorted(names)!r}"
+                    f" != {sorted(request)!r}"
+                )
+        if not self.constraints:
+            return np.ones(len(requests), dtype=bool)
+        mask = np.zeros(len(requests), dtype=bool)
+        if not requests:
+            return mask
+        columns = {}
+        for name in names:
+            values = []
+            for request in requests:
+                if len(value := _as_list(request[name])) != 1:
+                    raise ValueError(f"{name!r} must have a single value: {value!r}")
+                values.append(str(value[0]))
+            unique, codes = np.unique(values, return_inverse=True)
+            columns[name] = (self._encode_axis(name, unique.tolist()), codes)
+        for row in range(len(self.constraints)):
+            row_mask = np.ones(len(requests), dtype=bool)
+            for allowed, codes in columns.values():
+                row_mask &= allowed[row][codes]
+            mask |= row_mask
+        return mask
+
+    def iter_valid_requests(self, **axes: Sequence[Any]) -> Iterator[dict[str, Any]]:
+        """Iterate over the valid requests of a request grid.
+
+        Parameters
+        ----------
+        **axes: Sequence[Any]
+            Values of each request parameter (e.g., ``year=["2020", "2021"]``).
+
+        Yields
+        ------
+        dict[str,Any]
+            Valid requests, with one value per parameter.
+        """
+        mask = self.grid_mask(**axes)
+        names = list(axes)
+        for index in zip(*np.nonzero(mask)):
+            yield {name: axes[name][int(i)] for name, i in zip(names, index)}
+
+    def valid_requests(self, **axes: Sequence[Any]) -> list[dict[str, Any]]:
+        """List the valid requests of a request grid.
+
+        Parameters
+        ----------
+        **axes: Sequence[Any]
+            Values of each request parameter (e.g., ``year=["2020", "2021"]``).
+
+        Returns
+        -------
+        list[dict[str,Any]]
+            Valid requests, with one value per parameter.
+        """
+        return list(self.iter_valid_requests(**axes))
@@ -0,0 +1,117 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+from typing import Any, Sequence
+
+import attrs
+
+from . import processing
+
+
+@attrs.define(frozen=True)
+class CostEstimate:
+    """Estimated costs of a request."""
+
+    request: dict[str, Any]
+    costs: dict[str, Any]
+
+    @property
+    def cost(self) -> float:
+        """Estimated cost."""
+        return float(self.costs.get("cost", 0))
+
+    @property
+    def limit(self) -> float | None:
+        """Cost limit. None if unlimited."""
+        limit = self.costs.get("limit")
+        return None if limit is None else float(limit)
+
+    @property
+    def fits(self) -> bool:
+        """Whether the cost is within the limit."""
+        return self.limit is None or self.cost <= self.limit
+
+
+@attrs.define(frozen=True)
+class CostPlan:
+    """Estimated costs of many requests."""
+
+    estimates: list[CostEstimate]
+
+    @property
+    def total_cost(self) -> float:
+        """Sum of the estimated costs."""
+        return sum(estimate.cost for estimate in self.estimates)
+
+    @property
+    def fits(self) -> bool:
+        """Whether all requests are within the cost limit."""
+        return all(estimate.fits for estimate in self.estimates)
+
+    @property
+    def exceeding(self) -> list[CostEstimate]:
+        """Estimates of the requests exceeding the cost limit."""
+        return [estimate for estimate in self.estimates if not estimate.fits]
+
+
+@attrs.define(slots=False)
+class CostEstimator:
+    """Concurrent and memoized cost estimation.
+
+    Estimates are cached by canonical request, so equivalent requests are
+    estimated only once, even when requested concurrently.
+
+    Parameters
+    ----------
+    process: cads_api_client.Process
+        Process used to estimate costs.
+    max_workers: int
+        Maximum number of concurrent cost estimations.
+    """
+
+    process: processing.Process
+    max_workers: int = 4
+
+    def __attrs_post_init__(self) -> None:
+        self._costs: dict[str, concurrent.futures.Future[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, **request: Any) -> CostEstimate:
+        """Estimate the costs of a request."""
+        key = self.process.request_digest(**request)
+        with self._lock:
+            future = self._costs.get(key)
+            owner = future is None
+            if future is None:
+                future = self._costs[key] = concurrent.futures.Future()
+        if owner:
+            try:
+                future.set_result(self.process.estimate_costs(**request))
+            except Exception as exc:
+                with self._lock:
+                    del self._costs[key]
+                future.set_exception(exc)
+        return CostEstimate(request=request, costs=future.result())
+
+    def estimate_many(self, request_list: Sequence[dict[str, Any]]) -> CostPlan:
+        """Estimate the costs of many requests concurrently."""
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+            estimates = list(
+                executor.map(lambda request: self.estimate(**request), request_list)
+            )
+        return CostPlan(estimates)
@@ -0,0 +1,260 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from typing import Any
+
+import attrs
+import requests
+
+from . import normalization, processing
+
+NON_TERMINAL_STATUSES = ("accepted", "running")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    request_uid TEXT PRIMARY KEY,
+    collection_id TEXT,
+    status TEXT,
+    created TEXT,
+    started TEXT,
+    finished TEXT,
+    updated TEXT,
+    request_digest TEXT,
+    json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS jobs_request_digest ON jobs (request_digest);
+"""
+
+COLUMNS = (
+    "request_uid",
+    "collection_id",
+    "status",
+    "created",
+    "started",
+    "finished",
+    "updated",
+    "request_digest",
+)
+
+
+def _job_request(job_json: dict[str, Any]) -> dict[str, Any] | None:
+    request = job_json.get("metadata", {}).get("request", {}).get("ids")
+    return None if request is None else dict(request)
+
+
+@attrs.define(slots=False)
+class JobHistory:
+    """Local mirror of the job history.
+
+    Jobs are stored in SQLite with their status, timestamps, collection and
+    the digest of their request (see ``cads_api_client.normalization``).
+
+    Parameters
+    ----------
+    path: str
+        Path to the SQLite database. Use ``":memory:"`` for an in-memory mirror.
+    """
+
+    path: str = ":memory:"
+
+    def __attrs_post_init__(self) -> None:
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM jobs").fetchone()
+        return int(count)
+
+    def _upsert(self, job_json: dict[str, Any]) -> None:
+        request_digest = None
+        collection_id = job_json.get("processID")
+        if (request := _job_request(job_json)) is not None:
+            request_digest = normalization.request_digest(request, collection_id)
+        else:
+            row = self._connection.execute(
+                "SELECT request_digest FROM jobs WHERE request_uid = ?",
+                (job_json["jobID"],),
+            ).fetchone()
+            request_digest = None if row is None else row["request_digest"]
+        self._connection.execute(
+            "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job_json["jobID"],
+                collection_id,
+                job_json.get("status"),
+                job_json.get("created"),
+                job_json.get("started"),
+                job_json.get("finished"),
+                job_json.get("updated"),
+                request_digest,
+                json.dumps(job_json),
+            ),
+        )
+
+    def update(self, jobs_json: list[dict[str, Any]]) -> None:
+        """Add or update jobs."""
+        with self._lock, self._connection:
+            for job_json in jobs_json:
+                self._upsert(job_json)
+
+    def _last_created(self) -> str | None:
+        with self._lock:
+            (created,) = self._connection.execute(
+                "SELECT MAX(created) FROM jobs"
+            ).fetchone()
+        return None if created is None else str(created)
+
+    def _pending(self) -> set[str]:
+        placeholders = ", ".join("?" * len(NON_TERMINAL_STATUSES))
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT request_uid FROM jobs WHERE status IN ({placeholders})",
+                NON_TERMINAL_STATUSES,
+            ).fetchall()
+        return {row["request_uid"] for row in rows}
+
+    def sync(
+        self,
+        api: processing.Processing,
+        limit: int | None = None,
+        fetch_requests: bool = False,
+    ) -> int:
+        """Fetch the jobs created since the last sync and refresh pending jobs.
+
+        Parameters
+        ----------
+        api: cads_api_client.processing.Processing
+            Retrieve API.
+        limit: int or None
+            Number of jobs per page.
+        fetch_requests: bool, default: False
+            Whether to fetch the request of new jobs whose listing does not
+            include it (one extra call per job), to compute their digests.
+
+        Returns
+        -------
+        int
+            Number of jobs added or refreshed.
+        """
+        last_created = self._last_created()
+        pending = self._pending()
+        params: dict[str, Any] = {"sortby": "-created"}
+        if limit is not None:
+            params["limit"] = limit
+
+        seen: set[str] = set()
+        for page in api.get_jobs(**params).iter_all():
+            jobs_json = []
+            for job_json in page.items:
+                created = job_json.get("created")
+                if last_created is not None and created and created < last_created:
+                    break
+                if fetch_requests and _job_request(job_json) is None:
+                    job_json = api.get_job(job_json["jobID"], request=True)._json_dict
+                jobs_json.append(job_json)
+            self.update(jobs_json)
+            seen.update(job_json["jobID"] for job_json in jobs_json)
+            if len(jobs_json) < len(page.items):
+                break
+
+        refreshed = []
+        job_params = {"request": True} if fetch_requests else {}
+        for request_uid in sorted(pending - seen):
+            try:
+                job_json = api.get_job(request_uid, **job_params)._json_dict
+            except requests.HTTPError as exc:
+                if exc.response is None or exc.response.status_code != 404:
+                    raise
+                job_json = {**self.get(request_uid), "status": "deleted"}
+            refreshed.append(job_json)
+        self.update(refreshed)
+        return len(seen) + len(refreshed)
+
+    def get(self, request_uid: str) -> dict[str, Any]:
+        """Return the JSON of a job."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT json FROM jobs WHERE request_uid = ?", (request_uid,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(request_uid)
+        job_json: dict[str, Any] = json.loads(row["json"])
+        return job_json
+
+    def jobs(
+        self,
+        collection_id: str | None = None,
+        status: str | None = None,
+        request_digest: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Query the jobs, most recent first.
+
+        Parameters
+        ----------
+        collection_id: str or None
+            Filter by collection ID.
+        status: str or None
+            Filter by status.
+        request_digest: str or None
+            Filter by request digest.
+        limit: int or None
+            Maximum number of jobs.
+
+        Returns
+        -------
+        list[dict[str,Any]]
+            Request UID, collection ID, status, timestamps and request digest
+            of each job.
+        """
+        sql = f"SELECT {', '.join(COLUMNS)} FROM jobs"
+        conditions = []
+        parameters: list[Any] = []
+        for column, value in (
+            ("collection_id", collection_id),
+            ("status", status),
+            ("request_digest", request_digest),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._connection.execute(sql, parameters)]
+
+    def find(self, collection_id: str, **request: Any) -> list[dict[str, Any]]:
+        """Find the jobs submitted with an equivalent request, most recent first."""
+        return self.jobs(
+            collection_id=collection_id,
+            request_digest=normalization.request_digest(request, collection_id),
+        )
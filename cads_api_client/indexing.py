@@ -0,0 +1,266 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import datetime
+import json
+import re
+import sqlite3
+import threading
+from typing import Any, Sequence
+
+import attrs
+
+from .catalogue import Collections
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS collections (
+    id TEXT PRIMARY KEY,
+    updated TEXT,
+    west REAL,
+    south REAL,
+    east REAL,
+    north REAL,
+    begin_datetime TEXT,
+    end_datetime TEXT,
+    json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    collection_id TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (collection_id, keyword)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS collections_fts USING fts5(
+    id UNINDEXED, title, description, keywords
+);
+"""
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def _to_utc_isoformat(value: str | datetime.date | None) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc).isoformat()
+
+
+def _fts_query(query: str) -> str:
+    return " ".join(f'"{token}"' for token in TOKEN_RE.findall(query))
+
+
+@attrs.define(slots=False)
+class CollectionIndex:
+    """Local searchable index of catalogue collections.
+
+    Collection metadata is mirrored into SQLite, with a full-text (FTS5)
+    index on titles, descriptions and keywords.
+
+    Parameters
+    ----------
+    path: str
+        Path to the SQLite database. Use ``":memory:"`` for an in-memory index.
+    """
+
+    path: str = ":memory:"
+
+    def __attrs_post_init__(self) -> None:
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM collections"
+            ).fetchone()
+        return int(count)
+
+    def _upsert(self, collection_json: dict[str, Any]) -> bool:
+        collection_id = collection_json["id"]
+        updated = collection_json.get("updated")
+        row = self._connection.execute(
+            "SELECT updated, json FROM collections WHERE id = ?", (collection_id,)
+        ).fetchone()
+        data = json.dumps(collection_json, sort_keys=True)
+        if row is not None and row == (updated, data):
+            return False
+
+        extent = collection_json.get("extent", {})
+        bbox = extent.get("spatial", {}).get("bbox", [[None] * 4])[0]
+        begin, end = extent.get("temporal", {}).get("interval", [[None, None]])[0]
+        keywords = collection_json.get("keywords", [])
+        self._delete(collection_id)
+        self._connection.execute(
+            "INSERT INTO collections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                collection_id,
+                updated,
+                *bbox,
+                _to_utc_isoformat(begin),
+                _to_utc_isoformat(end),
+                data,
+            ),
+        )
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO keywords VALUES (?, ?)",
+            [(collection_id, keyword) for keyword in keywords],
+        )
+        self._connection.execute(
+            "INSERT INTO collections_fts VALUES (?, ?, ?, ?)",
+            (
+                collection_id,
+                collection_json.get("title", ""),
+                collection_json.get("description", ""),
+                " ".join(keywords),
+            ),
+        )
+        return True
+
+    def _delete(self, collection_id: str) -> None:
+        for table, column in (
+            ("collections", "id"),
+            ("keywords", "collection_id"),
+            ("collections_fts", "id"),
+        ):
+            self._connection.execute(
+                f"DELETE FROM {table} WHERE {column} = ?", (collection_id,)
+            )
+
+    def update(self, collections_json: Sequence[dict[str, Any]]) -> int:
+        """Add or update collections.
+
+        Returns
+        -------
+        int
+            Number of collections added or changed.
+        """
+        with self._lock, self._connection:
+            return sum(map(self._upsert, collections_json))
+
+    def refresh(self, collections: Collections | None) -> int:
+        """Mirror the catalogue, following the ``next`` links of the pages.
+
+        Unchanged collections are not rewritten, and collections no longer in
+        the catalogue are removed.
+
+        Parameters
+        ----------
+        collections: cads_api_client.Collections or None
+            First page of collections.
+
+        Returns
+        -------
+        int
+            Number of collections added, changed or removed.
+        """
+        seen: set[str] = set()
+        changed = 0
+        for page in [] if collections is None else collections.iter_all():
+            changed += self.update(page.items)
+            seen.update(collection["id"] for collection in page.items)
+        with self._lock, self._connection:
+            indexed = {
+                collection_id
+                for (collection_id,) in self._connection.execute(
+                    "SELECT id FROM collections"
+                )
+            }
+            for collection_id in indexed - seen:
+                self._delete(collection_id)
+        return changed + len(indexed - seen)
+
+    def search(
+        self,
+        query: str | None = None,
+        keywords: Sequence[str] | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+        start: str | datetime.date | None = None,
+        end: str | datetime.date | None = None,
+        limit: int | None = None,
+    ) -> list[str]:
+        """Search the index.
+
+        Parameters
+        ----------
+        query: str or None
+            Full-text search query. All words must match.
+        keywords: Sequence[str] or None
+            Keywords that collections must all have.
+        bbox: tuple[float,float,float,float] or None
+            Bounding box (W, S, E, N) that collections must intersect.
+        start, end: str or datetime.date or None
+            Time interval that the temporal extent of collections must overlap.
+        limit: int or None
+            Maximum number of results.
+
+        Returns
+        -------
+        list[str]
+            Collection IDs, sorted by relevance if ``query`` is provided.
+        """
+        sql = "SELECT collections.id FROM collections"
+        conditions: list[str] = []
+        parameters: list[Any] = []
+        order = "collections.id"
+        if query is not None and (fts_query := _fts_query(query)):
+            sql += " JOIN collections_fts ON collections_fts.id = collections.id"
+            conditions.append("collections_fts MATCH ?")
+            parameters.append(fts_query)
+            order = "collections_fts.rank, collections.id"
+        for keyword in keywords or []:
+            conditions.append(
+                "EXISTS (SELECT 1 FROM keywords"
+                " WHERE collection_id = collections.id AND keyword = ?)"
+            )
+            parameters.append(keyword)
+        if bbox is not None:
+            west, south, east, north = bbox
+            conditions.append("west <= ? AND east >= ? AND south <= ? AND north >= ?")
+            parameters.extend([east, west, north, south])
+        if (start := _to_utc_isoformat(start)) is not None:
+            conditions.append("(end_datetime IS NULL OR end_datetime >= ?)")
+            parameters.append(start)
+        if (end := _to_utc_isoformat(end)) is not None:
+            conditions.append("(begin_datetime IS NULL OR begin_datetime <= ?)")
+            parameters.append(end)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        with self._lock:
+            return [row[0] for row in self._connection.execute(sql, parameters)]
+
+    def get(self, collection_id: str) -> dict[str, Any]:
+        """Return the JSON of an indexed collection."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT json FROM collections WHERE id = ?", (collection_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(collection_id)
+        collection_json: dict[str, Any] = json.loads(row[0])
+        return collection_json
@@ -0,0 +1,138 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+from typing import Any, Mapping
+
+RECORDED_ALGORITHM = "sha256"
+
+# multihash codes (https://github.com/multiformats/multicodec)
+MULTIHASH_CODES = {0x11: "sha1", 0x12: "sha256", 0x13: "sha512", 0xD5: "md5"}
+
+# HTTP digest algorithms (RFC 3230 and RFC 9530)
+HTTP_ALGORITHMS = {
+    "md5": "md5",
+    "sha": "sha1",
+    "sha-256": "sha256",
+    "sha-512": "sha512",
+}
+
+
+def _read_varint(data: bytes) -> tuple[int, bytes]:
+    value = shift = 0
+    for i, byte in enumerate(data):
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, data[i + 1 :]
+        shift += 7
+    raise ValueError("truncated varint")
+
+
+def digests_from_multihash(multihash: str) -> dict[str, str]:
+    """Parse a hex-encoded multihash (e.g., STAC ``file:checksum``).
+
+    Returns
+    -------
+    dict[str,str]
+        Hex digest by hashlib algorithm name. Empty if the hash function is
+        not supported or the multihash is malformed.
+    """
+    try:
+        data = bytes.fromhex(multihash)
+        code, data = _read_varint(data)
+        length, data = _read_varint(data)
+    except ValueError:
+        return {}
+    if (algorithm := MULTIHASH_CODES.get(code)) is None or len(data) != length:
+        return {}
+    return {algorithm: data.hex()}
+
+
+def _b64_to_hex(value: str) -> str | None:
+    try:
+        return base64.b64decode(value.strip().strip(":"), validate=True).hex()
+    except (binascii.Error, ValueError):
+        return None
+
+
+def digests_from_headers(headers: Mapping[str, str]) -> dict[str, str]:
+    """Parse the digests of a full HTTP response.
+
+    ``Repr-Digest``, ``Digest`` and ``Content-MD5`` headers are supported.
+
+    Returns
+    -------
+    dict[str,str]
+        Hex digest by hashlib algorithm name.
+    """
+    digests: dict[str, str] = {}
+    if (content_md5 := headers.get("Content-MD5")) is not None:
+        if (digest := _b64_to_hex(content_md5)) is not None:
+            digests["md5"] = digest
+    for header in ("Digest", "Repr-Digest"):
+        for item in headers.get(header, "").split(","):
+            name, _, value = item.strip().partition("=")
+            if (algorithm := HTTP_ALGORITHMS.get(name.lower())) is None:
+                continue
+            if (digest := _b64_to_hex(value)) is not None:
+                digests[algorithm] = digest
+    return digests
+
+
+class StreamingHasher:
+    """Compute digests incrementally while data is written.
+
+    Parameters
+    ----------
+    expected: dict[str,str] or None
+        Expected hex digests by hashlib algorithm name.
+    """
+
+    def __init__(self, expected: dict[str, str] | None = None) -> None:
+        self.expected: dict[str, str] = {}
+        self._hashes: dict[str, Any] = {}
+        self.expect(expected or {})
+        self.expect({RECORDED_ALGORITHM: ""})
+
+    def expect(self, expected: dict[str, str]) -> None:
+        """Add expected digests, empty ones are only recorded."""
+        for algorithm, digest in expected.items():
+            if digest or algorithm not in self.expected:
+                self.expected[algorithm] = digest.lower()
+            self._hashes.setdefault(algorithm, hashlib.new(algorithm))
+
+    def reset(self) -> None:
+        self._hashes = {algorithm: hashlib.new(algorithm) for algorithm in self._hashes}
+
+    def update(self, data: bytes | memoryview) -> None:
+        for hash_ in self._hashes.values():
+            hash_.update(data)
+
+    def hexdigests(self) -> dict[str, str]:
+        return {
+            algorithm: hash_.hexdigest() for algorithm, hash_ in self._hashes.items()
+        }
+
+    def mismatches(self) -> list[str]:
+        """Return the algorithms whose digest does not match the expected one."""
+        actual = self.hexdigests()
+        return [
+            algorithm
+            for algorithm, digest in self.expected.items()
+            if digest and actual[algorithm] != digest
+        ]
@@ -0,0 +1,156 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import re
+from typing import Any, Literal
+
+Kind = Literal["list", "scalar", "ordered"]
+
+ORDERED_KEYS = ("area", "grid")
+ZERO_PADDED_KEYS = {"month": 2, "day": 2}
+DATE_KEYS = ("date",)
+LIST_WIDGETS = ("StringListWidget", "StringListArrayWidget")
+SCALAR_WIDGETS = ("StringChoiceWidget", "FreeformInputWidget")
+ORDERED_WIDGETS = ("GeographicExtentWidget", "GeographicExtentMapWidget")
+
+COMPACT_DATE_RE = re.compile(r"^(\d{4})(\d{2})(\d{2})$")
+
+
+def kinds_from_form(form: list[dict[str, Any]]) -> dict[str, Kind]:
+    """Infer the kind of each parameter from a form JSON."""
+    kinds: dict[str, Kind] = {}
+    for widget in form:
+        if (name := widget.get("name")) is None:
+            continue
+        if (widget_type := widget.get("type")) in LIST_WIDGETS:
+            kinds[name] = "list"
+        elif widget_type in SCALAR_WIDGETS:
+            kinds[name] = "scalar"
+        elif widget_type in ORDERED_WIDGETS:
+            kinds[name] = "ordered"
+    return kinds
+
+
+def kinds_from_inputs(inputs: dict[str, Any]) -> dict[str, Kind]:
+    """Infer the kind of each parameter from the inputs of a process JSON."""
+    kinds: dict[str, Kind] = {}
+    for name, input_json in inputs.items():
+        schema = input_json.get("schema", {})
+        if name in ORDERED_KEYS:
+            kinds[name] = "ordered"
+        elif schema.get("type") == "array":
+            kinds[name] = "list"
+        elif schema.get("type") is not None:
+            kinds[name] = "scalar"
+    return kinds
+
+
+def _normalize_date(value: str) -> str:
+    parts = re.split(r"/(?:to/)?", value)
+    normalized = []
+    for part in parts:
+        if match := COMPACT_DATE_RE.match(part):
+            part = "-".join(match.groups())
+        normalized.append(part)
+    return "/".join(normalized)
+
+
+def normalize_value(key: str, value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: normalize_value(k, v) for k, v in sorted(value.items())}
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value)
+    if (width := ZERO_PADDED_KEYS.get(key)) and value.isdigit():
+        value = value.zfill(width)
+    if key in DATE_KEYS:
+        value = _normalize_date(value)
+    return value
+
+
+def normalize_request(
+    request: dict[str, Any], kinds: dict[str, Kind] | None = None
+) -> dict[str, Any]:
+    """Canonicalize a request.
+
+    Keys are sorted and values are converted to strings. Multi-valued
+    parameters become sorted lists without duplicates, unless their order is
+    meaningful (e.g., ``area``). Scalars and one-element lists are equivalent:
+    parameters are lists unless ``kinds`` marks them as scalars.
+
+    Parameters
+    ----------
+    request: dict[str,Any]
+        Request parameters.
+    kinds: dict[str,{'list', 'scalar', 'ordered'}] or None
+        Kind of each parameter (see ``kinds_from_form`` and ``kinds_from_inputs``).
+
+    Returns
+    -------
+    dict[str,Any]
+        Canonical request.
+    """
+    kinds = kinds or {}
+    normalized: dict[str, Any] = {}
+    for key in sorted(request):
+        value = request[key]
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        values = [normalize_value(key, v) for v in values]
+        kind = kinds.get(key, "ordered" if key in ORDERED_KEYS else "list")
+        if kind == "ordered":
+            normalized[key] = values
+        elif kind == "scalar" and len(values) == 1:
+            normalized[key] = values[0]
+        else:
+            unique = {json.dumps(v, sort_keys=True): v for v in values}
+            normalized[key] = [unique[k] for k in sorted(unique)]
+    return normalized
+
+
+def request_digest(
+    request: dict[str, Any],
+    collection_id: str | None = None,
+    kinds: dict[str, Kind] | None = None,
+) -> str:
+    """Compute a stable digest of a request.
+
+    Parameters
+    ----------
+    request: dict[str,Any]
+        Request parameters.
+    collection_id: str or None
+        Collection ID, included in the digest if not None.
+    kinds: dict[str,{'list', 'scalar', 'ordered'}] or None
+        Kind of each parameter (see ``normalize_request``).
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest of the canonical request.
+    """
+    payload = {
+        "collection_id": collection_id,
+        "request": normalize_request(request, kinds),
+    }
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode()).hexdigest()
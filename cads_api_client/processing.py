@@ -14,14 +14,32 @@
 
 from __future__ import annotations
 
+import concurrent.futures
+import contextlib
 import datetime
 import functools
+import io
 import logging
 import os
+import queue
+import tempfile
+import threading
 import time
 import urllib.parse
 import warnings
-from typing import Any, Callable, Type, TypedDict, TypeVar
+from typing import (
+    IO,
+    Any,
+    Callable,
+    ClassVar,
+    ContextManager,
+    Generator,
+    Iterator,
+    Sequence,
+    Type,
+    TypedDict,
+    TypeVar,
+)
 
 try:
     from typing import Self
@@ -30,16 +48,33 @@ except ImportError:
 
 import attrs
 import multiurl
+import multiurl.base
 import requests
 
 import cads_api_client
 
-from . import config
+from . import (
+    archives,
+    config,
+    integrity,
+    normalization,
+    resuming,
+    sinks,
+    streaming,
+    tuning,
+)
 
 T_ApiResponse = TypeVar("T_ApiResponse", bound="ApiResponse")
 
 LOGGER = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+DOWNLOAD_PART_SIZE = 32 << 20
+DOWNLOAD_CONNECTIONS = 2
+DOWNLOAD_MAX_CONNECTIONS = 16
+READ_MAX_MEMORY = 64 << 20
+CHECKSUM_RETRIES = 1
+
 LEVEL_NAMES_MAPPING = {
     "CRITICAL": 50,
     "FATAL": 50,
@@ -71,6 +106,10 @@ class DownloadError(RuntimeError):
     pass
 
 
+class RangeNotSupportedError(DownloadError):
+    pass
+
+
 class LinkError(Exception):
     pass
 
@@ -273,6 +312,8 @@ class ApiResponse:
 
 @attrs.define
 class ApiResponsePaginated(ApiResponse):
+    _items_key: ClassVar[str]
+
     @property
     def next(self) -> Self | None:
         """Next page."""
@@ -283,9 +324,82 @@ class ApiResponsePaginated(ApiResponse):
         """Previous page."""
         return self._from_rel_href(rel="prev")
 
+    @property
+    def items(self) -> list[dict[str, Any]]:
+        """Items of the page."""
+        return list(self._json_dict[self._items_key])
+
+    def iter_all(self, prefetch: int = 1) -> Generator[Self, None, None]:
+        """Iterate over this page and the following ones.
+
+        Next pages are fetched in a background thread while the current page
+        is being processed.
+
+        Parameters
+        ----------
+        prefetch: int, default: 1
+            Maximum number of pages fetched ahead. If 0, fetch on demand.
+        """
+        if prefetch < 1:
+            page: Self | None = self
+            while page is not None:
+                yield page
+                page = page.next
+            return
+
+        pages: queue.Queue[tuple[Self | None, BaseException | None]]
+        pages = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+
+        def put(item: tuple[Self | None, BaseException | None]) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+                return True
+            return False
+
+        def fetch() -> None:
+            page: Self | None = self
+            try:
+                while page is not None and put((page, None)):
+                    page = page.next
+            except BaseException as exc:
+                put((None, exc))
+            else:
+                put((None, None))
+
+        thread = threading.Thread(target=fetch, daemon=True)
+        thread.start()
+        try:
+            while True:
+                page, exc = pages.get()
+                if exc is not None:
+                    raise exc
+                if page is None:
+                    return
+                yield page
+        finally:
+            stop.set()
+            thread.join()
+
+    def iter_items(self, prefetch: int = 1) -> Generator[dict[str, Any], None, None]:
+        """Iterate over the items of this page and the following ones.
+
+        Parameters
+        ----------
+        prefetch: int, default: 1
+            Maximum number of pages fetched ahead. If 0, fetch on demand.
+        """
+        for page in self.iter_all(prefetch=prefetch):
+            yield from page.items
+
 
 @attrs.define
 class Processes(ApiResponsePaginated):
+    _items_key = "processes"
+
     @property
     def collection_ids(self) -> list[str]:
         """Available collection IDs."""
@@ -373,6 +487,43 @@ class Process(ApiResponse):
         )
         return response._json_dict
 
+    @property
+    def _input_kinds(self) -> dict[str, normalization.Kind]:
+        return normalization.kinds_from_inputs(self._json_dict.get("inputs", {}))
+
+    def normalize_request(self, **request: Any) -> dict[str, Any]:
+        """Canonicalize a request, guided by the process inputs.
+
+        Parameters
+        ----------
+        **request: Any
+            Request parameters.
+
+        Returns
+        -------
+        dict[str,Any]
+            Canonical request.
+        """
+        return normalization.normalize_request(request, self._input_kinds)
+
+    def request_digest(self, **request: Any) -> str:
+        """Compute a stable digest of a request.
+
+        Equivalent requests (e.g., differing in key order, scalar vs list
+        values, or date formats) have the same digest.
+
+        Parameters
+        ----------
+        **request: Any
+            Request parameters.
+
+        Returns
+        -------
+        str
+            Hexadecimal digest.
+        """
+        return normalization.request_digest(request, self.id, self._input_kinds)
+
 
 @attrs.define(slots=False)
 class Remote:
@@ -605,6 +756,8 @@ class Job(ApiResponse):
 class Jobs(ApiResponsePaginated):
     """A class to interact with submitted jobs."""
 
+    _items_key = "jobs"
+
     @property
     def request_uids(self) -> list[str]:
         """List of request UIDs."""
@@ -624,6 +777,8 @@ class Jobs(ApiResponsePaginated):
 class Results(ApiResponse):
     """A class to interact with the results of a job."""
 
+    digests: dict[str, str] = attrs.field(init=False, factory=dict)
+
     def _check_size(self, target: str) -> None:
         if (target_size := os.path.getsize(target)) != (size := self.content_length):
             raise DownloadError(
@@ -635,28 +790,84 @@ class Results(ApiResponse):
         """Asset dictionary."""
         return dict(self._json_dict["asset"]["value"])
 
-    def _download(self, url: str, target: str) -> requests.Response:
-        download_options = {"stream": True, "resume_transfers": True}
-        download_options.update(self.download_options)
-        multiurl.download(
-            url,
-            target=target,
-            **self.retry_options,
-            **self.request_options,
-            **download_options,
+    @property
+    def expected_digests(self) -> dict[str, str]:
+        """Digests of the file provided by the asset (``file:checksum``)."""
+        if (checksum := self.asset.get("file:checksum")) is None:
+            return {}
+        return integrity.digests_from_multihash(checksum)
+
+    def _download(
+        self,
+        url: str,
+        target: str,
+        hasher: integrity.StreamingHasher,
+        partial: resuming.PartialDownload | None = None,
+    ) -> requests.Response:
+        # resume after connection errors, keeping the hasher state
+        size = os.path.getsize(target) if os.path.exists(target) else 0
+        if size and size == self.content_length:
+            response = requests.Response()  # mutliurl robust needs a response
+            response.status_code = 200
+            return response
+        headers = {"Range": f"bytes={size}-"} if size else {}
+        if size and partial is not None and partial.etag is not None:
+            headers["If-Range"] = partial.etag
+        response = self.session.get(
+            url, stream=True, headers=headers, **self.request_options
         )
-        return requests.Response()  # mutliurl robust needs a response
+        with response:
+            if not response.ok:
+                return response
+            if size and response.status_code != 206:
+                size = 0
+                hasher.reset()
+            if not size:
+                hasher.expect(integrity.digests_from_headers(response.headers))
+                if partial is not None:
+                    partial.restart(response.headers.get("ETag"))
+            progress_bar = self.download_options.get(
+                "progress_bar", multiurl.base.progress_bar
+            )
+            pbar = progress_bar(
+                total=self.content_length, initial=size, desc=os.path.basename(target)
+            )
+            with open(target, "ab" if size else "wb") as fp, pbar:
+                try:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        fp.write(chunk)
+                        hasher.update(chunk)
+                        pbar.update(len(chunk))
+                        if partial is not None:
+                            partial.written(len(chunk), fp)
+                finally:
+                    if partial is not None:
+                        fp.flush()
+                        partial.save()
+        return response
 
     def download(
         self,
         target: str | None = None,
+        resume: bool | None = None,
     ) -> str:
         """Download the results.
 
+        The file is verified while it is written, against the size and the
+        digests provided by the asset or the response headers. Corrupted files
+        are downloaded again. The SHA-256 digest is recorded in ``digests``.
+
         Parameters
         ----------
         target: str or None
-            Target path. If None, download to the working directory.
+            Target path or URL. If None, download to the working directory.
+            URLs (e.g., ``s3://bucket/key``) are written with fsspec, using the
+            ``storage_options`` download option, without staging on local disk.
+        resume: bool or None
+            Whether to resume interrupted downloads, also across restarts.
+            Data is written to ``<target>.part`` next to a JSON sidecar, and
+            renamed to the target once complete. If None, use the ``resume``
+            download option (default: False).
 
         Returns
         -------
@@ -665,17 +876,446 @@ class Results(ApiResponse):
         """
         url = self.location
         if target is None:
-            parts = urllib.parse.urlparse(url)
-            target = parts.path.strip("/").split("/")[-1]
+            target = self.filename
+        if sinks.is_url(target):
+            storage_options = self.download_options.get("storage_options", {})
+            with sinks.open_url(target, **storage_options) as fp:
+                self.download_to(fp)
+            return target
+        if resume is None:
+            resume = self.download_options.get("resume", False)
+
+        with self._reserve_space(target):
+            self._download_file(url, target, resume)
+        return target
 
-        if os.path.exists(target):
-            os.remove(target)
+    def _reserve_space(self, target: str) -> ContextManager[None]:
+        if (disk_budget := self.download_options.get("disk_budget")) is None:
+            return contextlib.nullcontext()
+        reservation: ContextManager[None] = disk_budget.reserve(
+            target, self.content_length
+        )
+        return reservation
 
+    def _download_file(self, url: str, target: str, resume: bool) -> None:
         robust_download = multiurl.robust(self._download, **self.retry_options)
-        robust_download(url, target)
-        self._check_size(target)
+        for attempt in range(1 + CHECKSUM_RETRIES):
+            hasher = integrity.StreamingHasher(self.expected_digests)
+            partial = None
+            path = target
+            if resume:
+                partial = resuming.PartialDownload.open(
+                    target, url, self.content_length, hasher
+                )
+                path = partial.part_path
+            elif os.path.exists(target):
+                os.remove(target)
+            robust_download(url, path, hasher, partial).raise_for_status()
+            self._check_size(path)
+            if not (mismatches := hasher.mismatches()):
+                break
+            self.log(
+                logging.WARNING,
+                f"Checksum mismatch ({', '.join(mismatches)}) for {target}",
+            )
+            if partial is not None:
+                partial.discard()
+            else:
+                os.remove(path)
+        else:
+            raise DownloadError(f"Download failed: checksum mismatch for {url}")
+        if partial is not None:
+            partial.commit()
+        self.digests = hasher.hexdigests()
+
+    def _download_to(
+        self,
+        url: str,
+        sink: sinks.Sink,
+        hasher: integrity.StreamingHasher,
+        position: list[int],
+    ) -> requests.Response:
+        # resume after connection errors, keeping the hasher state
+        headers = {"Range": f"bytes={position[0]}-"} if position[0] else {}
+        response = self.session.get(
+            url, stream=True, headers=headers, **self.request_options
+        )
+        with response:
+            if not response.ok:
+                return response
+            if position[0] and response.status_code != 206:
+                raise DownloadError(f"Download failed: cannot resume {url}")
+            if not position[0]:
+                hasher.expect(integrity.digests_from_headers(response.headers))
+            progress_bar = self.download_options.get(
+                "progress_bar", multiurl.base.progress_bar
+            )
+            pbar = progress_bar(
+                total=self.content_length, initial=position[0], desc=self.filename
+            )
+            with pbar:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    sink.write(chunk)
+                    hasher.update(chunk)
+                    position[0] += len(chunk)
+                    pbar.update(len(chunk))
+        return response
+
+    def download_to(self, sink: sinks.Sink) -> None:
+        """Stream the results into a sink, without writing to local disk.
+
+        The content is verified against the size and the digests provided by
+        the asset or the response headers. Sinks cannot be rewound, so
+        corrupted transfers raise ``DownloadError``.
+
+        Parameters
+        ----------
+        sink: cads_api_client.sinks.Sink
+            Object with a ``write`` method, e.g., a writable binary file object.
+        """
+        url = self.location
+        hasher = integrity.StreamingHasher(self.expected_digests)
+        position = [0]
+        robust_download_to = multiurl.robust(self._download_to, **self.retry_options)
+        robust_download_to(url, sink, hasher, position).raise_for_status()
+        if position[0] != self.content_length:
+            raise DownloadError(
+                f"Download failed: downloaded {position[0]} byte(s) out of {self.content_length}"
+            )
+        if mismatches := hasher.mismatches():
+            raise DownloadError(
+                f"Download failed: checksum mismatch ({', '.join(mismatches)}) for {url}"
+            )
+        self.digests = hasher.hexdigests()
+
+    def _download_range(
+        self,
+        url: str,
+        sink: sinks.MmapSink,
+        position: list[int],
+        stop: int,
+        progress: Callable[[int], None],
+    ) -> requests.Response:
+        # resume after connection errors from the last Byte written
+        response = requests.Response()  # mutliurl robust needs a response
+        response.status_code = 200
+        if position[0] >= stop:
+            return response
+        headers = {"Range": f"bytes={position[0]}-{stop - 1}"}
+        response = self.session.get(
+            url, stream=True, headers=headers, **self.request_options
+        )
+        with response:
+            if not response.ok:
+                return response
+            if response.status_code != 206:
+                raise RangeNotSupportedError(f"Range requests not supported by {url}")
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                chunk = chunk[: stop - position[0]]
+                sink.write_at(position[0], chunk)
+                position[0] += len(chunk)
+                progress(len(chunk))
+        if position[0] != stop:
+            raise requests.exceptions.ChunkedEncodingError(
+                f"Range request ended at byte {position[0]} out of {stop}"
+            )
+        return response
+
+    def download_ranges(
+        self,
+        target: str | None = None,
+        max_workers: int | None = None,
+        part_size: int | None = None,
+    ) -> str:
+        """Download the results with parallel range requests.
+
+        The target is preallocated to ``content_length`` and the parts are
+        written at their offsets through a memory map. The file is verified
+        against the digests provided by the asset once complete. Falls back to
+        ``download`` if the server does not support range requests.
+
+        Unless ``max_workers`` is given, the number of concurrent range
+        requests and the part size are tuned while downloading (see
+        ``cads_api_client.tuning.BandwidthTuner``), starting from the settings
+        recorded for the host in the ``range_tuning`` download option.
+
+        Parameters
+        ----------
+        target: str or None
+            Target path. If None, download to the working directory.
+        max_workers: int or None
+            Number of concurrent range requests. If None, tune it.
+        part_size: int or None
+            Initial size of the parts in Bytes. If None, use the recorded or
+            the default (32 MiB) part size.
+
+        Returns
+        -------
+        str
+            Path to the retrieved file.
+        """
+        url = self.location
+        if target is None:
+            target = self.filename
+        host = urllib.parse.urlparse(url).netloc
+        store: tuning.TuningStore | None = self.download_options.get("range_tuning")
+        if max_workers is None:
+            settings = store.get(host) if store is not None else None
+            settings = settings or tuning.RangeSettings(
+                DOWNLOAD_CONNECTIONS, DOWNLOAD_PART_SIZE
+            )
+            if part_size is not None:
+                settings = attrs.evolve(settings, part_size=part_size)
+        else:
+            settings = tuning.RangeSettings(
+                max_workers, part_size or DOWNLOAD_PART_SIZE
+            )
+        tuner = tuning.BandwidthTuner(
+            settings,
+            max_connections=max(settings.connections, DOWNLOAD_MAX_CONNECTIONS),
+            tune=max_workers is None,
+        )
+        if self.content_length <= settings.part_size or (
+            max_workers is not None and max_workers <= 1
+        ):
+            return self.download(target)
+
+        try:
+            with self._reserve_space(target):
+                self._download_file_ranges(url, target, tuner)
+        except RangeNotSupportedError:
+            self.log(logging.INFO, f"{url}: range requests not supported")
+            return self.download(target)
+        if tuner.tune and store is not None:
+            store.record(host, tuner.settings, tuner.throughput)
         return target
 
+    def _fetch_ranges(
+        self,
+        url: str,
+        sink: sinks.MmapSink,
+        tuner: tuning.BandwidthTuner,
+        progress: Callable[[int], None],
+    ) -> None:
+        robust_download_range = multiurl.robust(
+            self._download_range, **self.retry_options
+        )
+        size = self.content_length
+        start = 0
+        running: set[concurrent.futures.Future[requests.Response]] = set()
+        with concurrent.futures.ThreadPoolExecutor(tuner.max_connections) as executor:
+            try:
+                while start < size or running:
+                    settings = tuner.adjust()
+                    while start < size and len(running) < settings.connections:
+                        stop = min(start + settings.part_size, size)
+                        future = executor.submit(
+                            robust_download_range, url, sink, [start], stop, progress
+                        )
+                        running.add(future)
+                        start = stop
+                    done, running = concurrent.futures.wait(
+                        running,
+                        timeout=tuner.interval,
+                        return_when=concurrent.futures.FIRST_COMPLETED,
+                    )
+                    for future in done:
+                        future.result().raise_for_status()
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+
+    def _download_file_ranges(
+        self, url: str, target: str, tuner: tuning.BandwidthTuner
+    ) -> None:
+        progress_bar = self.download_options.get(
+            "progress_bar", multiurl.base.progress_bar
+        )
+        lock = threading.Lock()
+        size = self.content_length
+        for attempt in range(1 + CHECKSUM_RETRIES):
+            pbar = progress_bar(total=size, initial=0, desc=os.path.basename(target))
+
+            def progress(n: int) -> None:
+                tuner.record(n)
+                with lock:
+                    pbar.update(n)
+
+            try:
+                with sinks.MmapSink(target, size) as sink, pbar:
+                    self._fetch_ranges(url, sink, tuner, progress)
+                    hasher = integrity.StreamingHasher(self.expected_digests)
+                    view = sink.view()
+                    for start in range(0, size, DOWNLOAD_CHUNK_SIZE):
+                        hasher.update(view[start : start + DOWNLOAD_CHUNK_SIZE])
+                    view.release()
+            except BaseException:
+                if os.path.exists(target):
+                    os.remove(target)
+                raise
+            if not (mismatches := hasher.mismatches()):
+                break
+            self.log(
+                logging.WARNING,
+                f"Checksum mismatch ({', '.join(mismatches)}) for {target}",
+            )
+            os.remove(target)
+        else:
+            raise DownloadError(f"Download failed: checksum mismatch for {url}")
+        self.digests = hasher.hexdigests()
+
+    def _stream(self, headers: dict[str, str] | None = None) -> requests.Response:
+        robust_get = multiurl.robust(self.session.get, **self.retry_options)
+        response: requests.Response = robust_get(
+            self.location, stream=True, headers=headers or {}, **self.request_options
+        )
+        response.raise_for_status()
+        return response
+
+    def iter_content(self, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+        """Iterate over the content of the results, without writing to disk.
+
+        Parameters
+        ----------
+        chunk_size: int, default: 1 MiB
+            Size of the chunks in Bytes.
+
+        Returns
+        -------
+        Iterator[bytes]
+            Chunks of the file.
+        """
+        size = 0
+        with self._stream() as response:
+            for chunk in response.iter_content(chunk_size):
+                size += len(chunk)
+                yield chunk
+        if size != self.content_length:
+            raise DownloadError(
+                f"Download failed: downloaded {size} byte(s) out of {self.content_length}"
+            )
+
+    def open(self, chunk_size: int = 1 << 20) -> io.BufferedReader:
+        """Open the results as a read-only stream, without writing to disk.
+
+        Parameters
+        ----------
+        chunk_size: int, default: 1 MiB
+            Size of the chunks in Bytes.
+
+        Returns
+        -------
+        io.BufferedReader
+            Binary file object.
+        """
+        reader = streaming.ChunkReader(self.iter_content(chunk_size))
+        return io.BufferedReader(reader, buffer_size=chunk_size)
+
+    def read(self, max_memory: int = READ_MAX_MEMORY) -> IO[bytes]:
+        """Download the results into memory.
+
+        Results larger than ``max_memory`` are downloaded to an anonymous
+        temporary file instead, removed once closed.
+
+        Parameters
+        ----------
+        max_memory: int, default: 64 MiB
+            Maximum size in Bytes of the results kept in memory.
+
+        Returns
+        -------
+        IO[bytes]
+            Binary file object, positioned at the start.
+        """
+        fp: IO[bytes]
+        if self.content_length <= max_memory:
+            fp = io.BytesIO()
+        else:
+            fp = tempfile.TemporaryFile()
+        try:
+            self.download_to(fp)
+        except BaseException:
+            fp.close()
+            raise
+        fp.seek(0)
+        return fp
+
+    def open_remote(
+        self, block_size: int = 1 << 20, cache_blocks: int = 32, read_ahead: int = 2
+    ) -> io.BufferedReader:
+        """Open the results as a seekable file object, reading ranges on demand.
+
+        Parameters
+        ----------
+        block_size: int, default: 1 MiB
+            Size of the blocks read with each range request.
+        cache_blocks: int, default: 32
+            Maximum number of blocks cached.
+        read_ahead: int, default: 2
+            Number of blocks fetched ahead during sequential reads.
+
+        Returns
+        -------
+        io.BufferedReader
+            Seekable binary file object.
+        """
+        remote_file = streaming.RemoteFile(
+            self.location,
+            self.content_length,
+            session=self.session,
+            request_options=self.request_options,
+            retry_options=self.retry_options,
+            block_size=block_size,
+            cache_blocks=cache_blocks,
+            read_ahead=read_ahead,
+        )
+        return io.BufferedReader(remote_file, buffer_size=block_size)
+
+    def list_zip_members(self) -> list[archives.ZipMember]:
+        """List the files in zip results, reading only the central directory.
+
+        Returns
+        -------
+        list[cads_api_client.archives.ZipMember]
+            Names and sizes of the files in the archive.
+        """
+        with self.open_remote(block_size=1 << 16) as fp:
+            return archives.list_zip_members(fp)
+
+    def extract_zip_members(
+        self,
+        members: Sequence[str] | None = None,
+        target_dir: str | None = None,
+        block_size: int = 1 << 20,
+    ) -> list[str]:
+        """Extract files from zip results without downloading the whole archive.
+
+        Parameters
+        ----------
+        members: Sequence[str] or None
+            Names of the files to extract. If None, extract all files.
+        target_dir: str or None
+            Target directory. If None, extract to the working directory.
+        block_size: int, default: 1 MiB
+            Size of the blocks read with each range request.
+
+        Returns
+        -------
+        list[str]
+            Paths to the extracted files.
+        """
+        with self.open_remote(block_size=block_size) as fp:
+            return archives.extract_zip_members(
+                fp, target_dir or os.getcwd(), members=members
+            )
+
+    @property
+    def filename(self) -> str:
+        """File name."""
+        parts = urllib.parse.urlparse(self.location)
+        return parts.path.strip("/").split("/")[-1]
+
     @property
     def location(self) -> str:
         """File location."""
@@ -735,9 +1375,9 @@ class Processing:
         url = f"{self.url}/jobs"
         return Jobs.from_request("get", url, params=params, **self._request_kwargs)
 
-    def get_job(self, job_id: str) -> Job:
+    def get_job(self, job_id: str, **params: Any) -> Job:
         url = f"{self.url}/jobs/{job_id}"
-        return Job.from_request("get", url, **self._request_kwargs)
+        return Job.from_request("get", url, params=params, **self._request_kwargs)
 
     def submit(self, collection_id: str, **request: Any) -> Remote:
         return self.get_process(collection_id).submit(**request)
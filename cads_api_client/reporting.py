@@ -0,0 +1,175 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import collections
+import datetime
+import sys
+import threading
+import time
+from typing import IO, Any, Hashable
+
+import attrs
+
+STATES = ("pending", "processing", "downloading", "done", "failed")
+UNITS = ("B", "KiB", "MiB", "GiB", "TiB")
+
+
+def format_size(size: float) -> str:
+    for unit in UNITS[:-1]:
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} {UNITS[-1]}"
+
+
+class ProgressBar:
+    """Progress of a single download, reported to a ``ProgressAggregator``.
+
+    Compatible with the progress bars of ``multiurl``.
+    """
+
+    def __init__(self, aggregator: ProgressAggregator, key: Hashable) -> None:
+        self._aggregator = aggregator
+        self._key = key
+
+    def __enter__(self) -> ProgressBar:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def update(self, n: int) -> None:
+        self._aggregator._update(self._key, n)
+
+
+class JobProgress:
+    """Progress of a job in a batch, reported to a ``ProgressAggregator``."""
+
+    def __init__(self, aggregator: ProgressAggregator) -> None:
+        self._aggregator = aggregator
+        self.set_state("pending")
+
+    def set_state(self, state: str) -> None:
+        self._aggregator.set_state(self, state)
+
+    def progress_bar(
+        self, total: int, initial: int = 0, desc: str | None = None
+    ) -> ProgressBar:
+        return self._aggregator.progress_bar(total, initial=initial, desc=desc)
+
+
+@attrs.define(slots=False)
+class ProgressAggregator:
+    """Single progress line for concurrent downloads.
+
+    Shows the Bytes downloaded, the throughput, the ETA and the number of
+    jobs in each state. The line is rendered at most once per
+    ``refresh_interval``, whatever the number of updates.
+
+    Parameters
+    ----------
+    refresh_interval: float
+        Minimum time (in seconds) between renderings.
+    stream: IO[str]
+        Output stream.
+    """
+
+    refresh_interval: float = 1
+    stream: IO[str] = attrs.field(factory=lambda: sys.stderr)
+
+    def __attrs_post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._totals: dict[Hashable, int] = {}
+        self._done: dict[Hashable, int] = {}
+        self._states: dict[Hashable, str] = {}
+        self._transferred = 0
+        self._started = time.monotonic()
+        self._rendered = 0.0
+        self._width = 0
+
+    def progress_bar(
+        self, total: int, initial: int = 0, desc: str | None = None
+    ) -> ProgressBar:
+        """Return a progress bar, with the signature of ``multiurl.base.progress_bar``.
+
+        Progress bars with the same ``desc`` (e.g., retries of the same
+        download) replace each other.
+        """
+        key = object() if desc is None else desc
+        with self._lock:
+            self._totals[key] = total
+            self._done[key] = initial
+        return ProgressBar(self, key)
+
+    def add_job(self) -> JobProgress:
+        """Add a pending job."""
+        return JobProgress(self)
+
+    def set_state(self, job: Hashable, state: str) -> None:
+        """Set the state of a job (e.g., ``"processing"`` or ``"done"``)."""
+        with self._lock:
+            self._states[job] = state
+        self.refresh()
+
+    def _update(self, key: Hashable, n: int) -> None:
+        with self._lock:
+            self._done[key] += n
+            self._transferred += n
+        self.refresh()
+
+    def summary(self) -> str:
+        with self._lock:
+            total = sum(self._totals.values())
+            done = sum(self._done.values())
+            transferred = self._transferred
+            states = collections.Counter(self._states.values())
+        elapsed = time.monotonic() - self._started
+        throughput = transferred / elapsed if elapsed > 0 else 0.0
+        if throughput and total > done:
+            eta = str(datetime.timedelta(seconds=round((total - done) / throughput)))
+        else:
+            eta = "-"
+        jobs = ", ".join(f"{states[state]} {state}" for state in STATES)
+        return (
+            f"{format_size(done)} / {format_size(total)}"
+            f" | {format_size(throughput)}/s | ETA {eta} | {jobs}"
+        )
+
+    def refresh(self, force: bool = False) -> None:
+        """Render the progress line, unless rendered too recently."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._rendered < self.refresh_interval:
+                return
+            self._rendered = now
+        line = self.summary()
+        with self._lock:
+            padding = " " * max(self._width - len(line), 0)
+            self._width = len(line)
+            self.stream.write(f"\r{line}{padding}")
+            self.stream.flush()
+
+    def close(self) -> None:
+        """Render the final progress line."""
+        self.refresh(force=True)
+        self.stream.write("\n")
+        self.stream.flush()
+
+    def __enter__(self) -> ProgressAggregator:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
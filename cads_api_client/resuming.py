@@ -0,0 +1,141 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+from typing import IO
+
+import attrs
+
+from . import integrity
+
+LOGGER = logging.getLogger(__name__)
+
+PART_SUFFIX = ".part"
+STATE_SUFFIX = ".part.json"
+SAVE_INTERVAL = 16 << 20
+HASH_CHUNK_SIZE = 1 << 20
+
+
+@attrs.define(slots=False)
+class PartialDownload:
+    """Download in progress, resumable across restarts.
+
+    Data is written to ``<target>.part``. The sidecar ``<target>.part.json``
+    records the URL, the size, the ETag and the Bytes completed. The part
+    file is renamed to the target atomically once complete.
+
+    Parameters
+    ----------
+    target: str
+        Target path.
+    url: str
+        File URL.
+    size: int
+        File size in Bytes.
+    etag: str or None
+        ETag of the file, used to check that it did not change.
+    completed: int
+        Number of Bytes completed.
+    """
+
+    target: str
+    url: str
+    size: int
+    etag: str | None = None
+    completed: int = 0
+
+    def __attrs_post_init__(self) -> None:
+        self._saved = self.completed
+
+    @property
+    def part_path(self) -> str:
+        return f"{self.target}{PART_SUFFIX}"
+
+    @property
+    def state_path(self) -> str:
+        return f"{self.target}{STATE_SUFFIX}"
+
+    @classmethod
+    def open(
+        cls, target: str, url: str, size: int, hasher: integrity.StreamingHasher
+    ) -> PartialDownload:
+        """Resume a previous download of the same file, or start a new one.
+
+        The Bytes already downloaded are fed to the hasher.
+        """
+        self = cls(target, url, size)
+        try:
+            with open(self.state_path) as fp:
+                state = json.load(fp)
+        except (OSError, ValueError):
+            state = {}
+        if (state.get("url"), state.get("size")) == (url, size) and os.path.exists(
+            self.part_path
+        ):
+            self.etag = state.get("etag")
+            self.completed = min(state["completed"], os.path.getsize(self.part_path))
+        with open(self.part_path, "ab") as fp:
+            fp.truncate(self.completed)
+        if self.completed:
+            LOGGER.info(f"{target}: resuming download from byte {self.completed}")
+            with open(self.part_path, "rb") as fp:
+                while chunk := fp.read(HASH_CHUNK_SIZE):
+                    hasher.update(chunk)
+        self.save()
+        return self
+
+    def save(self) -> None:
+        """Record the state in the sidecar."""
+        state = {
+            "url": self.url,
+            "size": self.size,
+            "etag": self.etag,
+            "completed": self.completed,
+        }
+        partial = f"{self.state_path}.tmp"
+        with open(partial, "w") as fp:
+            json.dump(state, fp)
+        os.replace(partial, self.state_path)
+        self._saved = self.completed
+
+    def restart(self, etag: str | None) -> None:
+        """Start again from the first Byte."""
+        self.etag = etag
+        self.completed = 0
+        self.save()
+
+    def written(self, size: int, fp: IO[bytes]) -> None:
+        """Account for Bytes written, saving the state periodically."""
+        self.completed += size
+        if self.completed - self._saved >= SAVE_INTERVAL:
+            fp.flush()
+            self.save()
+
+    def commit(self) -> str:
+        """Rename the part file to the target and remove the sidecar."""
+        os.replace(self.part_path, self.target)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.state_path)
+        return self.target
+
+    def discard(self) -> None:
+        """Remove the part file and the sidecar."""
+        for path in (self.part_path, self.state_path):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
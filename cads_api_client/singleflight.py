@@ -0,0 +1,60 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Deduplicate concurrent calls with the same key.
+
+    The first caller runs the function, concurrent callers with the same key
+    wait for its result (or exception) instead of running it again.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, concurrent.futures.Future[T]] = {}
+        self._lock = threading.Lock()
+
+    def do(
+        self, key: str, func: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> tuple[T, bool]:
+        """Run a function once for all concurrent callers with the same key.
+
+        Returns
+        -------
+        tuple[T,bool]
+            Result and whether it was shared from another caller.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            shared = future is not None
+            if future is None:
+                future = self._calls[key] = concurrent.futures.Future()
+        if shared:
+            return future.result(), True
+
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result(), False
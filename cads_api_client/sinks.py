@@ -0,0 +1,134 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import contextlib
+import mmap
+import os
+import re
+import shutil
+from typing import IO, Any, Iterator, Protocol, runtime_checkable
+
+URL_PATTERN = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*://")
+
+
+@runtime_checkable
+class Sink(Protocol):
+    """Destination of a streamed download, e.g., a writable binary file object."""
+
+    def write(self, data: bytes, /) -> Any: ...
+
+
+class MemorySink:
+    """Sink keeping the content in memory."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes, /) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def getvalue(self) -> bytes:
+        return b"".join(self._chunks)
+
+
+def is_url(target: str) -> bool:
+    """Return whether the target is a URL (e.g., ``s3://bucket/key``)."""
+    return URL_PATTERN.match(target) is not None
+
+
+@contextlib.contextmanager
+def open_url(url: str, **storage_options: Any) -> Iterator[IO[bytes]]:
+    """Open a URL for writing with fsspec, e.g., as a multipart upload.
+
+    The upload is discarded, if supported by the file system, on errors.
+    """
+    try:
+        import fsspec
+    except ImportError:
+        raise ImportError("fsspec is required to download to URLs") from None
+
+    fp = fsspec.open(url, "wb", **storage_options).open()
+    try:
+        yield fp
+    except BaseException:
+        if (discard := getattr(fp, "discard", None)) is not None:
+            discard()
+        raise
+    finally:
+        fp.close()
+
+
+def copy_file(path: str, target: str, **storage_options: Any) -> None:
+    """Copy a local file to a path or to a URL."""
+    if not is_url(target):
+        shutil.copyfile(path, target)
+        return
+    with open(path, "rb") as fsrc, open_url(target, **storage_options) as fdst:
+        shutil.copyfileobj(fsrc, fdst)
+
+
+def preallocate(fd: int, size: int) -> None:
+    """Reserve disk space for a file, or make it sparse if not supported."""
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        os.ftruncate(fd, size)
+
+
+class MmapSink:
+    """Preallocated file written at arbitrary offsets through a memory map.
+
+    Parameters
+    ----------
+    path: str
+        Path to the file.
+    size: int
+        File size in Bytes.
+    """
+
+    def __init__(self, path: str, size: int) -> None:
+        self.path = path
+        self.size = size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            preallocate(fd, size)
+            self._mmap = mmap.mmap(fd, size) if size else None
+        finally:
+            os.close(fd)
+
+    def write_at(self, offset: int, data: bytes) -> None:
+        if offset + len(data) > self.size:
+            raise ValueError(f"write beyond the end of {self.path}")
+        if self._mmap is not None:
+            self._mmap[offset : offset + len(data)] = data
+
+    def view(self) -> memoryview:
+        """Read-only view of the content."""
+        if self._mmap is None:
+            return memoryview(b"")
+        return memoryview(self._mmap).toreadonly()
+
+    def close(self) -> None:
+        if self._mmap is not None and not self._mmap.closed:
+            self._mmap.flush()
+            self._mmap.close()
+
+    def __enter__(self) -> MmapSink:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
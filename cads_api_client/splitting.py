@@ -0,0 +1,140 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import datetime
+from typing import Any, Sequence
+
+import attrs
+
+from . import costing, processing
+
+SPLIT_KEYS = (
+    "date",
+    "year",
+    "month",
+    "day",
+    "variable",
+    "pressure_level",
+    "model_level",
+    "time",
+)
+
+
+class SplitError(RuntimeError):
+    pass
+
+
+def _split_date_range(date_range: str) -> list[str] | None:
+    start, _, end = date_range.partition("/")
+    try:
+        start_date = datetime.date.fromisoformat(start)
+        end_date = datetime.date.fromisoformat(end)
+    except ValueError:
+        return None
+    if start_date >= end_date:
+        return None
+    middle = start_date + (end_date - start_date) // 2
+    next_day = middle + datetime.timedelta(days=1)
+    return [f"{start_date}/{middle}", f"{next_day}/{end_date}"]
+
+
+def bisect_request(
+    request: dict[str, Any], split_keys: Sequence[str] = SPLIT_KEYS
+) -> list[dict[str, Any]] | None:
+    """Split a request in two halves along the first splittable key.
+
+    Returns None if the request cannot be split.
+    """
+    for key in split_keys:
+        if key not in request:
+            continue
+        value = request[key]
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        if len(values) > 1:
+            middle = len(values) // 2
+            halves = [values[:middle], values[middle:]]
+        elif key == "date" and (date_ranges := _split_date_range(str(values[0]))):
+            halves = [[date_range] for date_range in date_ranges]
+        else:
+            continue
+        if not isinstance(value, (list, tuple)):
+            return [{**request, key: half[0]} for half in halves]
+        return [{**request, key: half} for half in halves]
+    return None
+
+
+@attrs.define(slots=False)
+class RequestSplitter:
+    """Split requests until each piece fits the cost limit of a process.
+
+    Costs are estimated concurrently and memoized (see ``costing.CostEstimator``).
+
+    Parameters
+    ----------
+    process: cads_api_client.Process
+        Process used to estimate costs.
+    split_keys: Sequence[str]
+        Keys to split along, in order of preference.
+    max_workers: int
+        Maximum number of concurrent cost estimations.
+    """
+
+    process: processing.Process
+    split_keys: Sequence[str] = SPLIT_KEYS
+    max_workers: int = 4
+
+    def __attrs_post_init__(self) -> None:
+        self.estimator = costing.CostEstimator(
+            self.process, max_workers=self.max_workers
+        )
+
+    def fits(self, **request: Any) -> bool:
+        return self.estimator.estimate(**request).fits
+
+    def split(self, **request: Any) -> list[dict[str, Any]]:
+        """Split a request into pieces within the cost limit.
+
+        Parameters
+        ----------
+        **request: Any
+            Request parameters.
+
+        Returns
+        -------
+        list[dict[str,Any]]
+            Requests within the cost limit.
+
+        Raises
+        ------
+        SplitError
+            If a piece exceeds the cost limit and cannot be split further.
+        """
+        pieces = [request]
+        while True:
+            plan = self.estimator.estimate_many(pieces)
+            if plan.fits:
+                return pieces
+            next_pieces = []
+            for estimate in plan.estimates:
+                if estimate.fits:
+                    next_pieces.append(estimate.request)
+                elif (
+                    halves := bisect_request(estimate.request, self.split_keys)
+                ) is None:
+                    raise SplitError(f"cannot split request {estimate.request!r}")
+                else:
+                    next_pieces.extend(halves)
+            pieces = next_pieces
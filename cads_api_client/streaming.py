@@ -0,0 +1,195 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import io
+import threading
+from typing import Any, Iterator
+
+import multiurl
+import requests
+
+
+class ChunkReader(io.RawIOBase):
+    """Read-only, non-seekable file object over an iterator of chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        view = memoryview(buffer).cast("B")
+        size = min(len(view), len(self._buffer))
+        view[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed and (close := getattr(self._chunks, "close", None)):
+            close()
+        super().close()
+
+
+class RemoteFile(io.RawIOBase):
+    """Read-only, seekable file object over HTTP range requests.
+
+    The file is read in blocks, kept in an LRU cache. When blocks are read
+    sequentially, the following ones are fetched ahead in the background.
+
+    Parameters
+    ----------
+    url: str
+        File URL.
+    size: int
+        File size in Bytes.
+    session: requests.Session
+        Requests session.
+    request_options: dict[str,Any] or None
+        Options passed to the requests (e.g., ``timeout``).
+    retry_options: dict[str,Any] or None
+        Options passed to ``multiurl.robust``.
+    block_size: int
+        Size of the blocks in Bytes.
+    cache_blocks: int
+        Maximum number of blocks cached.
+    read_ahead: int
+        Number of blocks fetched ahead during sequential reads.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        size: int,
+        session: requests.Session,
+        request_options: dict[str, Any] | None = None,
+        retry_options: dict[str, Any] | None = None,
+        block_size: int = 1 << 20,
+        cache_blocks: int = 32,
+        read_ahead: int = 2,
+    ) -> None:
+        self.url = url
+        self.size = size
+        self.block_size = block_size
+        self.cache_blocks = max(cache_blocks, read_ahead + 1)
+        self.read_ahead = read_ahead
+        self._request_options = request_options or {}
+        self._robust_get = multiurl.robust(session.get, **(retry_options or {}))
+        self._position = 0
+        self._last_block: int | None = None
+        self._blocks: collections.OrderedDict[int, concurrent.futures.Future[bytes]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max(read_ahead, 1))
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"negative seek position: {position}")
+        self._position = position
+        return position
+
+    def read_range(self, start: int, stop: int) -> bytes:
+        """Read the Bytes in ``[start, stop)`` with a range request."""
+        headers = {"Range": f"bytes={start}-{stop - 1}"}
+        response = self._robust_get(self.url, headers=headers, **self._request_options)
+        response.raise_for_status()
+        content: bytes = response.content
+        if response.status_code != 206:
+            # range not supported: the whole file was sent
+            content = content[start:stop]
+        if len(content) != stop - start:
+            raise OSError(
+                f"Range request failed: read {len(content)} byte(s) out of {stop - start}"
+            )
+        return content
+
+    def _read_block(self, block: int) -> bytes:
+        start = block * self.block_size
+        return self.read_range(start, min(start + self.block_size, self.size))
+
+    def _get_block(self, block: int) -> concurrent.futures.Future[bytes]:
+        # call with the lock held
+        if (future := self._blocks.get(block)) is None:
+            future = self._executor.submit(self._read_block, block)
+            self._blocks[block] = future
+        self._blocks.move_to_end(block)
+        while len(self._blocks) > self.cache_blocks:
+            self._blocks.popitem(last=False)
+        return future
+
+    def block(self, block: int) -> bytes:
+        """Return a block, from the cache if possible."""
+        n_blocks = -(-self.size // self.block_size)
+        with self._lock:
+            future = self._get_block(block)
+            if block - 1 == self._last_block or block == 0:
+                for ahead in range(
+                    block + 1, min(block + self.read_ahead, n_blocks - 1) + 1
+                ):
+                    self._get_block(ahead)
+                self._blocks.move_to_end(block)
+            self._last_block = block
+        try:
+            return future.result()
+        except Exception:
+            with self._lock:
+                if self._blocks.get(block) is future:
+                    del self._blocks[block]
+            raise
+
+    def readinto(self, buffer: Any) -> int:
+        # read within a single block, callers loop over short reads
+        if self._position >= self.size:
+            return 0
+        view = memoryview(buffer).cast("B")
+        block, offset = divmod(self._position, self.block_size)
+        data = self.block(block)[offset:]
+        size = min(len(view), len(data))
+        view[:size] = data[:size]
+        self._position += size
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._executor.shutdown(wait=False)
+            self._blocks.clear()
+        super().close()
@@ -0,0 +1,224 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import datetime
+import itertools
+import json
+import os
+from typing import Any
+
+import attrs
+
+from . import batch, catalogue, normalization
+
+DATE_KEYS = ("date", "year", "month", "day")
+
+
+def _parse_date(value: Any) -> datetime.date:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(normalization.normalize_value("date", value))
+
+
+def date_requests(
+    request: dict[str, Any], dates: list[datetime.date], split_ymd: bool = False
+) -> list[dict[str, Any]]:
+    """Build the requests retrieving the dates provided.
+
+    Parameters
+    ----------
+    request: dict[str,Any]
+        Base request parameters, without date keys.
+    dates: list[datetime.date]
+        Dates to retrieve.
+    split_ymd: bool, default: False
+        Whether to use ``year``/``month``/``day`` keys (one request per month)
+        rather than ``date`` ranges (one request per contiguous range).
+
+    Returns
+    -------
+    list[dict[str,Any]]
+        Requests parameters.
+    """
+    dates = sorted(set(dates))
+    requests_list = []
+    if split_ymd:
+        for (year, month), group in itertools.groupby(
+            dates, key=lambda date: (date.year, date.month)
+        ):
+            days = [f"{date.day:02d}" for date in group]
+            requests_list.append(
+                {**request, "year": f"{year}", "month": f"{month:02d}", "day": days}
+            )
+        return requests_list
+
+    for _, items in itertools.groupby(
+        enumerate(dates), key=lambda item: item[1].toordinal() - item[0]
+    ):
+        run = [date for _, date in items]
+        date_range = f"{run[0].isoformat()}/{run[-1].isoformat()}"
+        requests_list.append({**request, "date": date_range})
+    return requests_list
+
+
+@attrs.define(slots=False)
+class SyncState:
+    """Dates already retrieved by a sync, persisted as JSON."""
+
+    path: str
+    fetched: set[str] = attrs.field(factory=set)
+    entries: list[dict[str, Any]] = attrs.field(factory=list)
+
+    @classmethod
+    def load(cls, path: str) -> SyncState:
+        try:
+            with open(path) as fp:
+                state = json.load(fp)
+        except FileNotFoundError:
+            return cls(path)
+        return cls(path, set(state["fetched"]), state["entries"])
+
+    def save(self) -> None:
+        partial = f"{self.path}.partial"
+        with open(partial, "w") as fp:
+            json.dump({"fetched": sorted(self.fetched), "entries": self.entries}, fp)
+        os.replace(partial, self.path)
+
+
+@attrs.define(slots=False)
+class DeltaSync:
+    """Incremental retrieval of growing time series.
+
+    Only the dates between ``start`` and the end of the collection that have
+    not been retrieved yet are submitted. Retrieved dates are recorded in a
+    state file, so that failed requests are retried by the next sync.
+
+    Parameters
+    ----------
+    collection: cads_api_client.Collection
+        Collection to sync.
+    request: dict[str,Any]
+        Base request parameters. Date keys (``date``, ``year``, ``month``
+        and ``day``) are replaced by the missing dates.
+    target_dir: str
+        Target directory.
+    state_path: str or None
+        Path to the state file. If None, use a file in ``target_dir`` named
+        after the digest of the base request.
+    start: datetime.date or None
+        First date to retrieve. If None, use the start of the ``date`` in the
+        base request or the begin datetime of the collection.
+    max_workers: int
+        Maximum number of requests processed concurrently.
+    """
+
+    collection: catalogue.Collection
+    request: dict[str, Any]
+    target_dir: str
+    state_path: str | None = None
+    start: datetime.date | None = None
+    max_workers: int = 4
+
+    @property
+    def base_request(self) -> dict[str, Any]:
+        """Base request parameters, without date keys."""
+        return {k: v for k, v in self.request.items() if k not in DATE_KEYS}
+
+    @property
+    def split_ymd(self) -> bool:
+        """Whether dates are requested using ``year``/``month``/``day`` keys."""
+        return "date" not in self.request and any(
+            key in self.request for key in DATE_KEYS
+        )
+
+    @property
+    def state_file(self) -> str:
+        if self.state_path is not None:
+            return self.state_path
+        digest = normalization.request_digest(self.base_request, self.collection.id)
+        return os.path.join(self.target_dir, f".sync-{digest[:16]}.json")
+
+    @property
+    def first_date(self) -> datetime.date:
+        if self.start is not None:
+            return self.start
+        if (date := self.request.get("date")) is not None:
+            date = date[0] if isinstance(date, (list, tuple)) else date
+            return _parse_date(str(date).split("/")[0])
+        if (begin_datetime := self.collection.begin_datetime) is not None:
+            return begin_datetime.date()
+        raise ValueError("start date is not defined")
+
+    @property
+    def last_date(self) -> datetime.date:
+        if (end_datetime := self.collection.end_datetime) is None:
+            raise ValueError(f"collection {self.collection.id!r} has no end datetime")
+        return end_datetime.date()
+
+    def missing_dates(self) -> list[datetime.date]:
+        """Return the dates available in the collection and not retrieved yet."""
+        fetched = SyncState.load(self.state_file).fetched
+        first, last = self.first_date.toordinal(), self.last_date.toordinal()
+        dates = (datetime.date.fromordinal(day) for day in range(first, last + 1))
+        return [date for date in dates if date.isoformat() not in fetched]
+
+    def missing_requests(self) -> list[dict[str, Any]]:
+        """Build the requests retrieving the missing dates."""
+        return date_requests(
+            self.base_request, self.missing_dates(), split_ymd=self.split_ymd
+        )
+
+    def _request_dates(self, request: dict[str, Any]) -> list[str]:
+        if not self.split_ymd:
+            first, last = map(_parse_date, request["date"].split("/"))
+            days = range(first.toordinal(), last.toordinal() + 1)
+            return [datetime.date.fromordinal(day).isoformat() for day in days]
+        return [f"{request['year']}-{request['month']}-{day}" for day in request["day"]]
+
+    def sync(self) -> list[batch.ManifestEntry]:
+        """Retrieve the missing dates and record them in the state file.
+
+        Returns
+        -------
+        list[cads_api_client.batch.ManifestEntry]
+            Manifest entries of the requests submitted.
+        """
+        request_list = self.missing_requests()
+        if not request_list:
+            return []
+        entries = batch.retrieve_many(
+            self.collection.process,
+            request_list,
+            target_dir=self.target_dir,
+            max_workers=self.max_workers,
+        )
+        state = SyncState.load(self.state_file)
+        for entry in entries:
+            if not entry.ok:
+                continue
+            dates = self._request_dates(entry.request)
+            state.fetched.update(dates)
+            state.entries.append(
+                {
+                    "dates": [dates[0], dates[-1]],
+                    "request_uid": entry.request_uid,
+                    "target": entry.target,
+                }
+            )
+        state.save()
+        return entries
@@ -0,0 +1,179 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+import attrs
+
+LOGGER = logging.getLogger(__name__)
+
+PART_SIZE_STEP = 1 << 20
+
+
+@attrs.define(frozen=True)
+class RangeSettings:
+    """Settings of range-parallel downloads.
+
+    Parameters
+    ----------
+    connections: int
+        Number of concurrent range requests.
+    part_size: int
+        Size of the parts in Bytes.
+    """
+
+    connections: int
+    part_size: int
+
+
+@attrs.define(slots=False)
+class BandwidthTuner:
+    """Tune range-parallel downloads by measuring the throughput.
+
+    Every ``interval``, the number of connections is doubled as long as the
+    throughput improves by at least ``min_gain``. Otherwise, the previous
+    number of connections is restored and the settings stop changing: the
+    link or the server is saturated. The part size follows the throughput
+    per connection, so that each part takes about ``part_seconds``.
+
+    Parameters
+    ----------
+    settings: RangeSettings
+        Initial settings.
+    max_connections: int
+        Maximum number of concurrent range requests.
+    interval: float
+        Time (in seconds) between measurements.
+    min_gain: float
+        Minimum relative throughput gain to keep adding connections.
+    part_seconds: float
+        Target time (in seconds) to download a part.
+    min_part_size: int
+        Minimum size of the parts in Bytes.
+    max_part_size: int
+        Maximum size of the parts in Bytes.
+    tune: bool
+        Whether to tune the settings. If False, the settings are fixed.
+    """
+
+    settings: RangeSettings
+    max_connections: int = 16
+    interval: float = 2
+    min_gain: float = 0.1
+    part_seconds: float = 4
+    min_part_size: int = 1 << 20
+    max_part_size: int = 256 << 20
+    tune: bool = True
+
+    def __attrs_post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._started = time.monotonic()
+        self._previous: tuple[RangeSettings, float] | None = None
+        self.settled = not self.tune
+        self.throughput = 0.0
+
+    def record(self, size: int) -> None:
+        """Account for Bytes downloaded."""
+        with self._lock:
+            self._bytes += size
+
+    def _part_size(self, throughput: float, connections: int) -> int:
+        part_size = int(throughput / connections * self.part_seconds)
+        part_size -= part_size % PART_SIZE_STEP
+        return max(self.min_part_size, min(part_size, self.max_part_size))
+
+    def adjust(self, now: float | None = None) -> RangeSettings:
+        """Measure the throughput and return the settings to use."""
+        now = time.monotonic() if now is None else now
+        if self.settled or now - self._started < self.interval:
+            return self.settings
+        with self._lock:
+            size, self._bytes = self._bytes, 0
+        throughput = size / (now - self._started)
+        self._started = now
+        self.throughput = throughput
+        connections = self.settings.connections
+        if self._previous is None or throughput > self._previous[1] * (
+            1 + self.min_gain
+        ):
+            self._previous = (self.settings, throughput)
+            if connections >= self.max_connections:
+                self.settled = True
+            else:
+                connections = min(2 * connections, self.max_connections)
+        else:
+            connections = self._previous[0].connections
+            self.throughput = self._previous[1]
+            self.settled = True
+        self.settings = RangeSettings(
+            connections, self._part_size(self.throughput, connections)
+        )
+        LOGGER.debug(f"Range download settings: {self.settings}")
+        return self.settings
+
+
+@attrs.define(slots=False)
+class TuningStore:
+    """Settings of range-parallel downloads chosen for each host.
+
+    Parameters
+    ----------
+    path: str or None
+        Path to the JSON file persisting the settings. If None, settings are
+        only kept in memory.
+    """
+
+    path: str | None = None
+
+    def __attrs_post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts: dict[str, dict[str, Any]] = {}
+        if self.path is not None:
+            try:
+                with open(self.path) as fp:
+                    self._hosts = json.load(fp)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as exc:
+                LOGGER.warning(f"Ignoring tuning file {self.path}: {exc}")
+
+    def get(self, host: str) -> RangeSettings | None:
+        with self._lock:
+            if (entry := self._hosts.get(host)) is None:
+                return None
+        return RangeSettings(entry["connections"], entry["part_size"])
+
+    def record(self, host: str, settings: RangeSettings, throughput: float) -> None:
+        """Record the settings chosen for a host."""
+        with self._lock:
+            self._hosts[host] = {
+                "connections": settings.connections,
+                "part_size": settings.part_size,
+                "throughput": throughput,
+                "updated": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            }
+            if self.path is not None:
+                partial = f"{self.path}.tmp"
+                with open(partial, "w") as fp:
+                    json.dump(self._hosts, fp, indent=2)
+                os.replace(partial, self.path)
@@ -0,0 +1,235 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import datetime
+from typing import Any, Callable
+
+import attrs
+
+LIST_WIDGETS = ("StringListWidget", "StringListArrayWidget")
+CHOICE_WIDGETS = ("StringChoiceWidget",)
+AREA_WIDGETS = ("GeographicExtentWidget", "GeographicExtentMapWidget")
+
+
+class InvalidRequestError(ValueError):
+    pass
+
+
+def _as_list(value: Any) -> list[Any]:
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _collect_values(details: dict[str, Any]) -> set[str]:
+    values = {str(value) for value in details.get("values", [])}
+    for group in details.get("groups", []):
+        values |= _collect_values(group)
+    return values
+
+
+def _is_number(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    try:
+        float(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _is_integer(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, float):
+        return value.is_integer()
+    try:
+        int(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _parse_date(value: Any) -> datetime.date | None:
+    try:
+        return datetime.date.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+FREEFORM_DTYPES: dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, (str, int, float)),
+    "integer": _is_integer,
+    "float": _is_number,
+}
+
+
+@attrs.define
+class Widget:
+    name: str
+    type: str
+    required: bool
+    details: dict[str, Any]
+    values: set[str] | None
+    min_start: datetime.date | None = None
+    max_end: datetime.date | None = None
+
+    @classmethod
+    def from_json(cls, widget_json: dict[str, Any]) -> Widget:
+        details = widget_json.get("details", {})
+        values = None
+        if widget_json.get("type") in LIST_WIDGETS + CHOICE_WIDGETS:
+            values = _collect_values(details)
+        return cls(
+            name=widget_json["name"],
+            type=widget_json.get("type", ""),
+            required=bool(widget_json.get("required", False)),
+            details=details,
+            values=values,
+            min_start=_parse_date(details.get("minStart")),
+            max_end=_parse_date(details.get("maxEnd")),
+        )
+
+    @property
+    def has_default(self) -> bool:
+        return self.details.get("default") not in (None, [], "")
+
+    def validate(self, value: Any) -> list[str]:
+        if self.type in CHOICE_WIDGETS and len(_as_list(value)) != 1:
+            return [f"{self.name!r} must have a single value"]
+
+        if self.values is not None:
+            invalid = [v for v in _as_list(value) if str(v) not in self.values]
+            return [f"invalid value {v!r} for {self.name!r}" for v in invalid]
+
+        if self.type == "FreeformInputWidget":
+            dtype = self.details.get("dtype", "string")
+            if (is_valid := FREEFORM_DTYPES.get(dtype)) is not None and not all(
+                is_valid(v) for v in _as_list(value)
+            ):
+                return [f"{self.name!r} must be of type {dtype}"]
+
+        if self.type in AREA_WIDGETS:
+            area = _as_list(value)
+            if len(area) != 4 or not all(_is_number(v) for v in area):
+                return [f"{self.name!r} must be a list of 4 numbers (N, W, S, E)"]
+
+        if self.type == "GeographicLocationWidget":
+            if not isinstance(value, dict) or not all(
+                _is_number(value.get(k)) for k in ("latitude", "longitude")
+            ):
+                return [f"{self.name!r} must have numeric latitude and longitude"]
+
+        if self.type == "DateRangeWidget":
+            return self._validate_date_range(value)
+
+        return []
+
+    def _validate_date_range(self, value: Any) -> list[str]:
+        errors = []
+        for date_range in _as_list(value):
+            start, _, end = str(date_range).partition("/")
+            try:
+                dates = [datetime.date.fromisoformat(d) for d in (start, end or start)]
+            except ValueError:
+                errors.append(f"invalid date range {date_range!r} for {self.name!r}")
+                continue
+            if (
+                dates[0] > dates[1]
+                or (self.min_start is not None and dates[0] < self.min_start)
+                or (self.max_end is not None and dates[1] > self.max_end)
+            ):
+                errors.append(
+                    f"date range {date_range!r} out of bounds for {self.name!r}"
+                )
+        return errors
+
+
+@attrs.define
+class FormValidator:
+    """Validate requests locally against the form of a collection.
+
+    The form is compiled once, so requests can be checked before submission
+    without any round trip to the server.
+    Parameters that are not in the form are ignored, and required parameters
+    with a default value in the form can be omitted.
+
+    Parameters
+    ----------
+    form: list[dict[str,Any]]
+        Form JSON (see ``cads_api_client.Collection.form``).
+    """
+
+    form: list[dict[str, Any]]
+    _widgets: dict[str, Widget] = attrs.field(init=False, factory=dict)
+    _exclusive_groups: list[Widget] = attrs.field(init=False, factory=list)
+
+    def __attrs_post_init__(self) -> None:
+        for widget_json in self.form:
+            if "name" not in widget_json:
+                continue
+            widget = Widget.from_json(widget_json)
+            if widget.type == "ExclusiveGroupWidget":
+                self._exclusive_groups.append(widget)
+            else:
+                self._widgets[widget.name] = widget
+
+    def validate(self, **request: Any) -> list[str]:
+        """Validate a request.
+
+        Parameters
+        ----------
+        **request: Any
+            Request parameters.
+
+        Returns
+        -------
+        list[str]
+            Error messages. Empty if the request is valid.
+        """
+        errors = []
+        grouped = set()
+        for group in self._exclusive_groups:
+            children = group.details.get("children", [])
+            grouped.update(children)
+            selected = [child for child in children if child in request]
+            if len(selected) > 1:
+                errors.append(f"only one of {selected!r} can be selected")
+            elif not selected and group.required and not group.has_default:
+                errors.append(f"one of {children!r} is required")
+
+        for name, widget in self._widgets.items():
+            if name in request:
+                errors.extend(widget.validate(request[name]))
+            elif widget.required and not widget.has_default and name not in grouped:
+                errors.append(f"missing required parameter {name!r}")
+        return errors
+
+    def check(self, **request: Any) -> None:
+        """Check a request, raising an error if it is invalid.
+
+        Parameters
+        ----------
+        **request: Any
+            Request parameters.
+
+        Raises
+        ------
+        InvalidRequestError
+            If the request is not valid.
+        """
+        if errors := self.validate(**request):
+            raise InvalidRequestError("\n".join(errors))
@@ -0,0 +1,153 @@
+# Copyright 2022, European Union.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Sequence
+
+import attrs
+
+from .catalogue import Catalogue, Collection
+
+LOGGER = logging.getLogger(__name__)
+
+Callback = Callable[[Collection], None]
+
+
+@attrs.define(frozen=True)
+class CollectionVersion:
+    """Validators and timestamps identifying a version of a collection."""
+
+    etag: str | None = attrs.field(default=None, eq=False)
+    last_modified: str | None = attrs.field(default=None, eq=False)
+    end_datetime: str | None = None
+    updated_datetime: str | None = None
+
+    @classmethod
+    def from_collection(cls, collection: Collection) -> CollectionVersion:
+        end_datetime = collection.end_datetime
+        updated_datetime = collection.updated_datetime
+        return cls(
+            etag=collection.response.headers.get("ETag"),
+            last_modified=collection.response.headers.get("Last-Modified"),
+            end_datetime=None if end_datetime is None else end_datetime.isoformat(),
+            updated_datetime=(
+                None if updated_datetime is None else updated_datetime.isoformat()
+            ),
+        )
+
+
+@attrs.define(slots=False)
+class CatalogueWatcher:
+    """Watch catalogue collections and fire callbacks when they are updated.
+
+    Collections are polled with conditional requests (``If-None-Match`` and
+    ``If-Modified-Since``), so unchanged collections cost a ``304 Not
+    Modified`` reply. A collection is updated when its end datetime or its
+    update datetime change.
+
+    Parameters
+    ----------
+    catalogue: cads_api_client.catalogue.Catalogue
+        Catalogue API.
+    collection_ids: Sequence[str]
+        IDs of the collections to watch.
+    interval: float
+        Seconds between polls.
+    """
+
+    catalogue: Catalogue
+    collection_ids: Sequence[str]
+    interval: float = 600
+
+    def __attrs_post_init__(self) -> None:
+        self.callbacks: list[Callback] = []
+        self._versions: dict[str, CollectionVersion] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add_callback(self, callback: Callback) -> None:
+        """Register a function called with each updated collection."""
+        self.callbacks.append(callback)
+
+    def check(self, collection_id: str) -> Collection | None:
+        """Check a collection and fire the callbacks if it was updated.
+
+        The first check of a collection only records its version.
+
+        Returns
+        -------
+        cads_api_client.Collection or None
+            The updated collection, or None if not updated.
+        """
+        previous = self._versions.get(collection_id)
+        collection = self.catalogue.get_collection_if_modified(
+            collection_id,
+            etag=None if previous is None else previous.etag,
+            last_modified=None if previous is None else previous.last_modified,
+        )
+        if collection is None:
+            return None
+
+        version = CollectionVersion.from_collection(collection)
+        self._versions[collection_id] = version
+        if previous is None or previous == version:
+            return None
+
+        LOGGER.info(f"collection {collection_id!r} updated")
+        for callback in self.callbacks:
+            callback(collection)
+        return collection
+
+    def poll(self) -> list[Collection]:
+        """Check all watched collections once.
+
+        Returns
+        -------
+        list[cads_api_client.Collection]
+            Updated collections.
+        """
+        updated = []
+        for collection_id in self.collection_ids:
+            try:
+                collection = self.check(collection_id)
+            except Exception:
+                LOGGER.exception(f"failed to check collection {collection_id!r}")
+                continue
+            if collection is not None:
+                updated.append(collection)
+        return updated
+
+    def run(self) -> None:
+        """Poll the collections until stopped."""
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Poll the collections in a background thread."""
+        if self._thread is not None:
+            raise RuntimeError("watcher already started")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling and wait for the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
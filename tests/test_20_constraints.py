@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+import responses
+
+np = pytest.importorskip("numpy")
+
+from cads_api_client import catalogue, constraints  # noqa: E402
+
+COLLECTION_URL = "http://localhost:8080/api/catalogue/v1/collections/dummy"
+
+CONSTRAINTS_JSON = [
+    {"year": ["2020", "2021"], "variable": ["temperature"]},
+    {"year": ["2021"], "variable": ["vorticity"], "level": ["500", "850"]},
+]
+
+
+@pytest.fixture
+def validator() -> constraints.ConstraintsValidator:
+    return constraints.ConstraintsValidator(CONSTRAINTS_JSON)
+
+
+def test_constraints_grid_mask(validator: constraints.ConstraintsValidator) -> None:
+    mask = validator.grid_mask(
+        year=[2020, 2021],
+        variable=["temperature", "vorticity"],
+        level=["500", "1000"],
+    )
+    expected = np.array(
+        [
+            [[True, True], [False, False]],
+            [[True, True], [True, False]],
+        ]
+    )
+    np.testing.assert_array_equal(mask, expected)
+
+
+def test_constraints_requests_mask(
+    validator: constraints.ConstraintsValidator,
+) -> None:
+    requests = [
+        {"year": "2020", "variable": "vorticity", "level": "500"},
+        {"year": "2021", "variable": "vorticity", "level": "850"},
+        {"year": "2021", "variable": "temperature", "level": "1000"},
+        {"year": "2022", "variable": "temperature", "level": "1000"},
+    ]
+    mask = validator.requests_mask(requests)
+    np.testing.assert_array_equal(mask, [False, True, True, False])
+
+
+def test_constraints_valid_requests(
+    validator: constraints.ConstraintsValidator,
+) -> None:
+    actual = validator.valid_requests(year=["2020", "2021"], variable=["vorticity"])
+    assert actual == [{"year": "2021", "variable": "vorticity"}]
+
+
+def test_constraints_empty() -> None:
+    validator = constraints.ConstraintsValidator([])
+    assert validator.grid_mask(year=["2020", "2021"]).all()
+    assert validator.requests_mask([{"year": "2020"}]).all()
+
+
+def test_constraints_duplicated_values(
+    validator: constraints.ConstraintsValidator,
+) -> None:
+    mask = validator.grid_mask(year=["2020", 2020, "2022"])
+    np.testing.assert_array_equal(mask, [True, True, False])
+
+
+def test_constraints_requests_mask_lists(
+    validator: constraints.ConstraintsValidator,
+) -> None:
+    requests = [
+        {"year": ["2020"], "variable": "temperature"},
+        {"year": "2020", "variable": ["vorticity"]},
+    ]
+    np.testing.assert_array_equal(validator.requests_mask(requests), [True, False])
+
+
+@pytest.mark.parametrize(
+    "requests,match",
+    [
+        ([{"year": "2020"}, {"variable": "temperature"}], "same parameters"),
+        ([{"year": ["2020", "2021"]}], "single value"),
+    ],
+)
+def test_constraints_requests_mask_error(
+    validator: constraints.ConstraintsValidator,
+    requests: list[dict[str, Any]],
+    match: str,
+) -> None:
+    with pytest.raises(ValueError, match=match):
+        validator.requests_mask(requests)
+
+
+@responses.activate
+def test_constraints_collection_validator() -> None:
+    responses.add(responses.GET, COLLECTION_URL, json={"id": "dummy"})
+    responses.add(
+        responses.GET, f"{COLLECTION_URL}/constraints.json", json=CONSTRAINTS_JSON
+    )
+    collection = catalogue.Collection.from_request(
+        "get",
+        COLLECTION_URL,
+        headers={},
+        session=None,
+        retry_options={},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+    validator = collection.constraints_validator
+    assert validator.constraints == CONSTRAINTS_JSON
+    assert collection.constraints_validator is validator
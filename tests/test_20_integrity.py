@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+
+import pytest
+
+from cads_api_client import integrity
+
+DATA = b"dummy data"
+MD5 = hashlib.md5(DATA).hexdigest()
+SHA256 = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.mark.parametrize(
+    "multihash,expected",
+    [
+        (f"1220{SHA256}", {"sha256": SHA256}),
+        (f"d50110{MD5}", {"md5": MD5}),
+        (f"1221{SHA256}", {}),  # wrong length
+        (f"9999{SHA256}", {}),  # unsupported
+        ("not hex", {}),
+    ],
+)
+def test_integrity_digests_from_multihash(
+    multihash: str, expected: dict[str, str]
+) -> None:
+    assert integrity.digests_from_multihash(multihash) == expected
+
+
+def test_integrity_digests_from_headers() -> None:
+    md5_b64 = base64.b64encode(bytes.fromhex(MD5)).decode()
+    sha256_b64 = base64.b64encode(bytes.fromhex(SHA256)).decode()
+    assert integrity.digests_from_headers({"Content-MD5": md5_b64}) == {"md5": MD5}
+    assert integrity.digests_from_headers(
+        {"Digest": f"MD5={md5_b64}, SHA-256={sha256_b64}, UNIXsum=30637"}
+    ) == {"md5": MD5, "sha256": SHA256}
+    assert integrity.digests_from_headers(
+        {"Repr-Digest": f"sha-256=:{sha256_b64}:"}
+    ) == {"sha256": SHA256}
+    assert integrity.digests_from_headers({"Content-MD5": "???"}) == {}
+
+
+def test_integrity_streaming_hasher() -> None:
+    hasher = integrity.StreamingHasher({"md5": MD5})
+    hasher.update(DATA[:5])
+    hasher.update(DATA[5:])
+    assert hasher.mismatches() == []
+    assert hasher.hexdigests() == {"md5": MD5, "sha256": SHA256}
+
+    hasher.expect({"sha256": "0" * 64})
+    assert hasher.mismatches() == ["sha256"]
+
+    hasher.reset()
+    assert hasher.mismatches() == ["md5", "sha256"]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import datetime
+
+import responses
+
+from cads_api_client import normalization, processing
+
+PROCESS_URL = "http://localhost:8080/api/retrieve/v1/processes/dummy"
+PROCESS_JSON = {
+    "id": "dummy",
+    "inputs": {
+        "variable": {"schema": {"type": "array", "items": {"type": "string"}}},
+        "format": {"schema": {"type": "string"}},
+        "area": {"schema": {"type": "array", "items": {"type": "number"}}},
+    },
+}
+
+
+def test_normalization_normalize_request() -> None:
+    request = {
+        "year": 2020,
+        "month": [2, "1", "01"],
+        "variable": "temperature",
+        "date": "20200101/to/20200131",
+        "area": [50.0, 0, 40, 10.5],
+        "day": datetime.date(2020, 1, 1),
+    }
+    assert normalization.normalize_request(request) == {
+        "area": ["50", "0", "40", "10.5"],
+        "date": ["2020-01-01/2020-01-31"],
+        "day": ["2020-01-01"],
+        "month": ["01", "02"],
+        "variable": ["temperature"],
+        "year": ["2020"],
+    }
+
+
+def test_normalization_request_digest() -> None:
+    digest = normalization.request_digest(
+        {"year": "2020", "variable": ["b", "a"]}, "dummy"
+    )
+    assert digest == normalization.request_digest(
+        {"variable": ("a", "b", "a"), "year": 2020}, "dummy"
+    )
+    assert digest != normalization.request_digest(
+        {"year": "2020", "variable": ["b", "a"]}, "other"
+    )
+    assert digest != normalization.request_digest(
+        {"year": "2020", "variable": ["a"]}, "dummy"
+    )
+
+
+def test_normalization_kinds_from_form() -> None:
+    form = [
+        {"name": "variable", "type": "StringListWidget"},
+        {"name": "format", "type": "StringChoiceWidget"},
+        {"name": "area", "type": "GeographicExtentWidget"},
+        {"name": "licences", "type": "LicenceWidget"},
+    ]
+    assert normalization.kinds_from_form(form) == {
+        "variable": "list",
+        "format": "scalar",
+        "area": "ordered",
+    }
+
+
+@responses.activate
+def test_normalization_process() -> None:
+    responses.get(PROCESS_URL, json=PROCESS_JSON)
+    process = processing.Process.from_request(
+        "get",
+        PROCESS_URL,
+        headers={},
+        session=None,
+        retry_options={},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+    assert process.normalize_request(format=["grib"], variable="t") == {
+        "format": "grib",
+        "variable": ["t"],
+    }
+    assert process.request_digest(format="grib") == normalization.request_digest(
+        {"format": "grib"}, "dummy", {"format": "scalar"}
+    )
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+import requests
+import responses
+
+from cads_api_client import processing
+
+JOBS_URL = "http://localhost:8080/api/retrieve/v1/jobs"
+
+
+def get_jobs(n_pages: int, fail_at: int | None = None) -> processing.Jobs:
+    for page in range(n_pages):
+        links = []
+        if page + 1 < n_pages:
+            links.append({"rel": "next", "href": f"{JOBS_URL}?page={page + 1}"})
+        responses.get(
+            JOBS_URL,
+            status=500 if page == fail_at else 200,
+            json={"jobs": [{"jobID": f"{page}-{i}"} for i in range(2)], "links": links},
+            match=[responses.matchers.query_param_matcher({"page": str(page)})],
+        )
+    return processing.Jobs.from_request(
+        "get",
+        f"{JOBS_URL}?page=0",
+        headers={},
+        session=None,
+        retry_options={"maximum_tries": 1},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+@responses.activate
+def test_pagination_iter_items(prefetch: int) -> None:
+    jobs = get_jobs(4)
+    actual = [job["jobID"] for job in jobs.iter_items(prefetch=prefetch)]
+    assert actual == [f"{page}-{i}" for page in range(4) for i in range(2)]
+    assert len(responses.calls) == 4
+
+
+@responses.activate
+def test_pagination_prefetch() -> None:
+    jobs = get_jobs(10)
+    pages = jobs.iter_all(prefetch=2)
+    assert next(pages) is jobs
+    time.sleep(0.2)
+    # pages are fetched ahead while the first one is processed, up to a limit
+    assert 1 < len(responses.calls) < 10
+
+    pages.close()
+    n_calls = len(responses.calls)
+    time.sleep(0.2)
+    assert len(responses.calls) == n_calls
+
+
+@responses.activate
+def test_pagination_error() -> None:
+    jobs = get_jobs(3, fail_at=2)
+    pages = jobs.iter_all()
+    assert [page.request_uids for page in [next(pages), next(pages)]] == [
+        ["0-0", "0-1"],
+        ["1-0", "1-1"],
+    ]
+    with pytest.raises(requests.HTTPError):
+        next(pages)
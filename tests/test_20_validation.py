@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+import responses
+
+from cads_api_client import catalogue, validation
+
+COLLECTION_URL = "http://localhost:8080/api/catalogue/v1/collections/dummy"
+
+FORM_JSON: list[dict[str, Any]] = [
+    {
+        "name": "product_type",
+        "type": "StringChoiceWidget",
+        "required": True,
+        "details": {"values": ["reanalysis", "ensemble_mean"]},
+    },
+    {
+        "name": "variable",
+        "type": "StringListWidget",
+        "required": True,
+        "details": {"values": ["temperature", "vorticity"]},
+    },
+    {
+        "name": "pressure_level",
+        "type": "StringListArrayWidget",
+        "required": False,
+        "details": {
+            "groups": [
+                {"label": "Low", "values": ["1000", "925"]},
+                {"label": "High", "values": ["1"]},
+            ]
+        },
+    },
+    {
+        "name": "date",
+        "type": "DateRangeWidget",
+        "required": False,
+        "details": {"minStart": "1940-01-01", "maxEnd": "not-a-date"},
+    },
+    {
+        "name": "geographical_extent",
+        "type": "ExclusiveGroupWidget",
+        "required": True,
+        "details": {"children": ["global", "area"], "default": "global"},
+    },
+    {"name": "global", "type": "LabelWidget", "details": {}},
+    {"name": "area", "type": "GeographicExtentWidget", "required": True, "details": {}},
+    {"name": "grid", "type": "FreeformInputWidget", "details": {"dtype": "float"}},
+    {
+        "name": "number",
+        "type": "FreeformInputWidget",
+        "details": {"dtype": "integer"},
+    },
+    {
+        "name": "format",
+        "type": "StringChoiceWidget",
+        "required": True,
+        "details": {"values": ["grib", "netcdf"], "default": ["grib"]},
+    },
+    {"name": "licences", "type": "LicenceWidget", "details": {}},
+]
+
+
+@pytest.fixture
+def validator() -> validation.FormValidator:
+    return validation.FormValidator(FORM_JSON)
+
+
+def test_validation_valid(validator: validation.FormValidator) -> None:
+    request = {
+        "product_type": "reanalysis",
+        "variable": ["temperature", "vorticity"],
+        "pressure_level": [1000, "1"],
+        "date": "2020-01-01/2020-01-31",
+        "area": [50, 0, 40, 10],
+        "grid": ["0.25", 0.25],
+        "number": ["1", 2],
+        "_timestamp": "ignored",
+    }
+    assert validator.validate(**request) == []
+    validator.check(**request)
+
+    # malformed bounds in the form are ignored
+    assert validator.validate(**{**request, "date": "2999-01-01"}) == []
+
+
+@pytest.mark.parametrize(
+    "request_update,expected",
+    [
+        ({"product_type": ["reanalysis", "ensemble_mean"]}, "single value"),
+        ({"variable": "dummy"}, "invalid value 'dummy' for 'variable'"),
+        ({"pressure_level": "2"}, "invalid value '2' for 'pressure_level'"),
+        ({"date": "2020-01-31/2020-01-01"}, "out of bounds"),
+        ({"date": "1900-01-01/1900-01-31"}, "out of bounds"),
+        ({"date": "2020-13-01"}, "invalid date range"),
+        ({"area": [50, 0, 40]}, "list of 4 numbers"),
+        ({"global": "1"}, "only one of"),
+        ({"grid": "dummy"}, "must be of type float"),
+        ({"grid": ["0.25", "dummy"]}, "must be of type float"),
+        ({"number": 1.5}, "must be of type integer"),
+    ],
+)
+def test_validation_invalid(
+    validator: validation.FormValidator,
+    request_update: dict[str, Any],
+    expected: str,
+) -> None:
+    request: dict[str, Any] = {
+        "product_type": "reanalysis",
+        "variable": "temperature",
+        "area": [50, 0, 40, 10],
+    }
+    request.update(request_update)
+    with pytest.raises(validation.InvalidRequestError, match=expected):
+        validator.check(**request)
+
+
+def test_validation_required(validator: validation.FormValidator) -> None:
+    assert validator.validate() == [
+        "missing required parameter 'product_type'",
+        "missing required parameter 'variable'",
+    ]
+
+
+@responses.activate
+def test_validation_collection_form_validator() -> None:
+    responses.add(responses.GET, COLLECTION_URL, json={"id": "dummy"})
+    form = responses.add(responses.GET, f"{COLLECTION_URL}/form.json", json=FORM_JSON)
+    collection = catalogue.Collection.from_request(
+        "get",
+        COLLECTION_URL,
+        headers={},
+        session=None,
+        retry_options={},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+    assert collection.form_validator is collection.form_validator
+    assert form.call_count == 1
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import threading
+import time
+
+import pytest
+import responses
+
+from cads_api_client import Results, budgeting
+
+RESULTS_URL = "http://localhost:8080/api/retrieve/v1/jobs/dummy/results"
+DATA_URL = "http://localhost:8080/data/dummy.grib"
+
+
+def test_budgeting_free_space(tmp_path: pathlib.Path) -> None:
+    budget = budgeting.DiskBudget(min_free=1000)
+    budget.free_space = lambda directory: 10_000  # type: ignore[method-assign]
+    assert budget.available(str(tmp_path)) == 9_000
+
+    with budget.reserve(str(tmp_path / "1.grib"), 6_000):
+        assert budget.available(str(tmp_path)) == 3_000
+        admitted = threading.Event()
+
+        def download() -> None:
+            with budget.reserve(str(tmp_path / "2.grib"), 6_000):
+                admitted.set()
+
+        thread = threading.Thread(target=download)
+        thread.start()
+        time.sleep(0.1)
+        assert not admitted.is_set()
+    thread.join(timeout=5)
+    assert admitted.is_set()
+    assert budget.available(str(tmp_path)) == 9_000
+
+
+def test_budgeting_budget(tmp_path: pathlib.Path) -> None:
+    budget = budgeting.DiskBudget(budget={str(tmp_path): 10_000})
+    assert budget.get_budget(str(tmp_path / "other")) is None
+
+    with pytest.raises(ValueError):
+        with budget.reserve(str(tmp_path / "1.grib"), 6_000):
+            raise ValueError
+    assert budget.available(str(tmp_path)) == 10_000
+
+    with budget.reserve(str(tmp_path / "1.grib"), 6_000):
+        pass
+    assert budget.available(str(tmp_path)) == 4_000
+    with pytest.raises(budgeting.DiskBudgetError, match="exhausted"):
+        with budget.reserve(str(tmp_path / "2.grib"), 6_000):
+            pass
+
+
+@responses.activate
+def test_budgeting_download(tmp_path: pathlib.Path) -> None:
+    budget = budgeting.DiskBudget(budget=15)
+    responses.get(
+        RESULTS_URL,
+        json={"asset": {"value": {"href": DATA_URL, "file:size": 10}}},
+    )
+    responses.get(DATA_URL, body=b"0123456789")
+    results = Results.from_request(
+        "get",
+        RESULTS_URL,
+        headers={},
+        session=None,
+        retry_options={"maximum_tries": 1},
+        request_options={},
+        download_options={"disk_budget": budget},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+    target = str(tmp_path / "1.grib")
+    assert results.download(target) == target
+    assert budget.available(str(tmp_path)) == 5
+
+    with pytest.raises(budgeting.DiskBudgetError):
+        results.download(str(tmp_path / "2.grib"))
+    assert os.listdir(tmp_path) == ["1.grib"]
+    assert len(responses.calls) == 2
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import concurrent.futures
+import io
+import json
+import os
+import pathlib
+import time
+from typing import Any
+
+import pytest
+import responses
+
+from cads_api_client import ApiClient, caching
+
+API_URL = "http://localhost:8080/api"
+
+
+def test_caching_file_lock(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "key.lock")
+    lock = caching.FileLock(path)
+    other = caching.FileLock(path)
+
+    assert lock.acquire()
+    assert not other.acquire()
+    assert lock.read_owner()["token"] == lock.token  # type: ignore[index]
+
+    # only the owner removes the lock
+    other.release()
+    assert os.path.exists(path)
+    lock.release()
+    assert not os.path.exists(path)
+    assert other.acquire()
+    other.release()
+
+
+def test_caching_file_lock_stale(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "key.lock")
+    lock = caching.FileLock(path, stale_after=60)
+    assert lock.acquire()
+    lock._stop.set()  # simulate a dead owner
+
+    past = time.time() - 120
+    os.utime(path, (past, past))
+    other = caching.FileLock(path, stale_after=60)
+    assert other.is_stale()
+    assert other.acquire()
+    assert other.read_owner()["token"] == other.token  # type: ignore[index]
+
+    lock.release()
+    assert os.path.exists(path)
+    other.release()
+
+
+def test_caching_get_or_create(tmp_path: pathlib.Path) -> None:
+    cache = caching.ResultCache(str(tmp_path), poll_interval=0.01)
+    calls = []
+
+    def create(path: str) -> dict[str, Any]:
+        calls.append(path)
+        time.sleep(0.1)
+        pathlib.Path(path).write_text("data")
+        return {"filename": "data.grib"}
+
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        futures = [
+            executor.submit(cache.get_or_create, "key", create) for _ in range(4)
+        ]
+        entries = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    expected = (str(tmp_path / "key"), {"filename": "data.grib"})
+    assert entries == [expected] * 4
+    assert cache.lookup("key") == expected
+    assert sorted(os.listdir(tmp_path)) == ["key", "key.json"]
+
+
+def test_caching_get_or_create_error(tmp_path: pathlib.Path) -> None:
+    cache = caching.ResultCache(str(tmp_path))
+
+    def create(path: str) -> dict[str, Any]:
+        pathlib.Path(path).write_text("partial")
+        raise ValueError("dummy")
+
+    with pytest.raises(ValueError, match="dummy"):
+        cache.get_or_create("key", create)
+    assert cache.lookup("key") is None
+    assert os.listdir(tmp_path) == []
+
+
+@responses.activate
+def test_caching_retrieve(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> None:
+    responses.get(f"{API_URL}/catalogue/v1/messages", json={})
+    cache_dir = tmp_path / "cache"
+    client = ApiClient(
+        url=API_URL, key="dummy", maximum_tries=0, cache_dir=str(cache_dir)
+    )
+    submissions = []
+
+    class DummyResults:
+        filename = "data.grib"
+        digests = {"sha256": "dummy"}
+
+        def download(self, target: str | None = None) -> str:
+            assert target is not None
+            pathlib.Path(target).write_text("data")
+            return target
+
+    class DummyRemote:
+        request_uid = "dummy-uid"
+
+        def make_results(self) -> DummyResults:
+            return DummyResults()
+
+    def submit(collection_id: str, **request: Any) -> DummyRemote:
+        submissions.append(request)
+        return DummyRemote()
+
+    monkeypatch.setattr(client, "submit", submit)
+    first = client.retrieve("dummy", target=str(tmp_path / "1.grib"), year=2020)
+    second = client.retrieve("dummy", target=str(tmp_path / "2.grib"), year="2020")
+
+    buffer = client.retrieve("dummy", target=io.BytesIO(), year=2020)
+
+    assert len(submissions) == 1
+    assert pathlib.Path(first).read_text() == pathlib.Path(second).read_text()
+    assert buffer.getvalue() == b"data"
+    (metadata_path,) = cache_dir.glob("*.json")
+    metadata = json.loads(metadata_path.read_text())
+    assert metadata["request_uid"] == "dummy-uid"
+    assert metadata["sha256"] == "dummy"
+    assert metadata["request"] == {"year": ["2020"]}
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+import pathlib
+
+import requests
+import responses
+
+from cads_api_client import coalescing, processing
+
+PROCESS_URL = "http://localhost:8080/api/retrieve/v1/processes/dummy"
+JOB_URL = "http://localhost:8080/api/retrieve/v1/jobs/{}"
+DATA_URL = "http://localhost:8080/data/{}.grib"
+
+
+def costing_callback(
+    request: requests.PreparedRequest,
+) -> tuple[int, dict[str, str], str]:
+    assert request.body is not None
+    variables = json.loads(request.body)["inputs"]["variable"]
+    return (200, {}, json.dumps({"cost": len(variables), "limit": 2}))
+
+
+def execution_callback(
+    request: requests.PreparedRequest,
+) -> tuple[int, dict[str, str], str]:
+    assert request.body is not None
+    inputs = json.loads(request.body)["inputs"]
+    uid = "-".join(inputs["variable"]) + f"-{inputs['year']}"
+    job_json = {
+        "jobID": uid,
+        "status": "successful",
+        "links": [{"rel": "monitor", "href": JOB_URL.format(uid)}],
+    }
+    responses.get(JOB_URL.format(uid), json=job_json)
+    responses.get(
+        f"{JOB_URL.format(uid)}/results",
+        json={"asset": {"value": {"href": DATA_URL.format(uid), "file:size": 1}}},
+    )
+    responses.head(DATA_URL.format(uid), headers={"content-length": "1"})
+    responses.get(DATA_URL.format(uid), body="x")
+    return (201, {}, json.dumps(job_json))
+
+
+@responses.activate
+def test_coalescing(tmp_path: pathlib.Path) -> None:
+    responses.get(PROCESS_URL, json={"id": "dummy"})
+    responses.add_callback(
+        responses.POST, f"{PROCESS_URL}/costing", callback=costing_callback
+    )
+    execution = responses.add_callback(
+        responses.POST, f"{PROCESS_URL}/execution", callback=execution_callback
+    )
+    process = processing.Process.from_request(
+        "get",
+        PROCESS_URL,
+        headers={},
+        session=None,
+        retry_options={"maximum_tries": 1},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+    coalescer = coalescing.RequestCoalescer(process, target_dir=str(tmp_path))
+    futures = [
+        coalescer.submit(variable=["a"], year="2020"),
+        coalescer.submit(variable="b", year="2020"),
+        coalescer.submit(variable=["c"], year="2020"),
+        coalescer.submit(variable=["a"], year="2021"),
+        coalescer.submit(variable=["a"], year="2020"),
+    ]
+    entries = coalescer.flush()
+    assert execution.call_count == 3
+    assert [entry.request_uid for entry in entries] == ["a-b-2020", "c-2020", "a-2021"]
+
+    actual = [future.result() for future in futures]
+    assert [entry.request_uid for entry in actual] == [
+        "a-b-2020",
+        "a-b-2020",
+        "c-2020",
+        "a-2021",
+        "a-b-2020",
+    ]
+    assert actual[1].request == {"variable": "b", "year": "2020"}
+    assert actual[1].target == str(tmp_path / "a-b-2020-a-b-2020.grib")
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+
+import requests
+import responses
+
+from cads_api_client import costing, processing
+
+PROCESS_URL = "http://localhost:8080/api/retrieve/v1/processes/dummy"
+
+
+def costing_callback(
+    request: requests.PreparedRequest,
+) -> tuple[int, dict[str, str], str]:
+    assert request.body is not None
+    inputs = json.loads(request.body)["inputs"]
+    variables = inputs["variable"]
+    cost = len(variables) if isinstance(variables, list) else 1
+    return (200, {}, json.dumps({"id": "size", "cost": cost, "limit": 2}))
+
+
+@responses.activate
+def test_costing_estimate_many() -> None:
+    responses.get(PROCESS_URL, json={"id": "dummy"})
+    costing_response = responses.add_callback(
+        responses.POST, f"{PROCESS_URL}/costing", callback=costing_callback
+    )
+    process = processing.Process.from_request(
+        "get",
+        PROCESS_URL,
+        headers={},
+        session=None,
+        retry_options={},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+    estimator = costing.CostEstimator(process)
+    plan = estimator.estimate_many(
+        [
+            {"variable": ["a"]},
+            {"variable": "a"},
+            {"variable": ["a", "b", "c"]},
+            {"variable": ["c", "b"]},
+        ]
+    )
+    assert [estimate.cost for estimate in plan.estimates] == [1, 1, 3, 2]
+    assert plan.total_cost == 7
+    assert not plan.fits
+    assert plan.exceeding == [plan.estimates[2]]
+    assert costing_response.call_count == 3
+
+    estimator.estimate_many([{"variable": ["b", "c"]}])
+    assert costing_response.call_count == 3
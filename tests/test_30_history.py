@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import pathlib
+from typing import Any
+
+import requests
+import responses
+
+from cads_api_client import history, normalization, processing
+
+API_URL = "http://localhost:8080/api/retrieve"
+JOBS_URL = f"{API_URL}/v1/jobs"
+
+
+def job_json(uid: str, created: str, status: str = "successful") -> dict[str, Any]:
+    return {
+        "jobID": uid,
+        "processID": "dummy",
+        "status": status,
+        "created": created,
+        "metadata": {"request": {"ids": {"variable": uid}}},
+    }
+
+
+def mock_jobs(*pages: list[dict[str, Any]]) -> None:
+    for i, page in enumerate(pages):
+        links = []
+        if i + 1 < len(pages):
+            links.append({"rel": "next", "href": f"{JOBS_URL}?page={i + 1}"})
+        params = {"page": str(i)} if i else {"sortby": "-created"}
+        responses.get(
+            JOBS_URL,
+            json={"jobs": page, "links": links},
+            match=[responses.matchers.query_param_matcher(params)],
+        )
+
+
+@responses.activate
+def test_history_sync(tmp_path: pathlib.Path) -> None:
+    api = processing.Processing(
+        API_URL,
+        headers={},
+        session=requests.Session(),
+        retry_options={"maximum_tries": 1},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+    job_history = history.JobHistory(str(tmp_path / "jobs.sqlite"))
+    mock_jobs(
+        [job_json("c", "2024-01-03"), job_json("b", "2024-01-02", "running")],
+        [job_json("a", "2024-01-01", "failed")],
+    )
+    assert job_history.sync(api) == 3
+    assert [job["request_uid"] for job in job_history.jobs()] == ["c", "b", "a"]
+    assert [job["request_uid"] for job in job_history.jobs(status="failed")] == ["a"]
+
+    # only new jobs are listed, pending jobs are refreshed
+    responses.reset()
+    mock_jobs(
+        [job_json("e", "2024-01-05"), job_json("d", "2024-01-04")],
+        [job_json("c", "2024-01-03")],
+        [job_json("b", "2024-01-02", "running")],
+    )
+    responses.get(f"{JOBS_URL}/b", json=job_json("b", "2024-01-02"))
+    assert job_history.sync(api) == 4
+    assert {call.request.url for call in responses.calls} == {
+        f"{JOBS_URL}?sortby=-created",
+        f"{JOBS_URL}?page=1",
+        f"{JOBS_URL}?page=2",
+        f"{JOBS_URL}/b",
+    }
+    assert len(job_history) == 5
+    assert job_history.jobs(status="running") == []
+
+    (job,) = job_history.find("dummy", variable=["d"])
+    assert job["request_uid"] == "d"
+    assert job["request_digest"] == normalization.request_digest(
+        {"variable": "d"}, "dummy"
+    )
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import datetime
+import pathlib
+from typing import Any
+
+import pytest
+import responses
+
+from cads_api_client import catalogue, indexing
+
+DATASETS_URL = "http://localhost:8080/api/catalogue/v1/datasets"
+
+
+def collection_json(
+    collection_id: str,
+    title: str,
+    keywords: list[str],
+    bbox: list[float],
+    interval: list[str | None],
+    updated: str = "2024-01-01T00:00:00Z",
+) -> dict[str, Any]:
+    return {
+        "id": collection_id,
+        "title": title,
+        "description": f"Description of {title}",
+        "keywords": keywords,
+        "extent": {"spatial": {"bbox": [bbox]}, "temporal": {"interval": [interval]}},
+        "updated": updated,
+    }
+
+
+ERA5 = collection_json(
+    "reanalysis-era5-single-levels",
+    "ERA5 hourly data on single levels",
+    ["Product type: Reanalysis", "Spatial coverage: Global"],
+    [-180, -90, 180, 90],
+    ["1940-01-01T00:00:00Z", None],
+)
+CERRA = collection_json(
+    "reanalysis-cerra-land",
+    "CERRA sub-daily regional reanalysis data for Europe",
+    ["Product type: Reanalysis", "Spatial coverage: Europe"],
+    [-58, 20, 74, 75],
+    ["1984-09-01T00:00:00Z", "2021-06-30T00:00:00Z"],
+)
+CMIP6 = collection_json(
+    "projections-cmip6",
+    "CMIP6 climate projections",
+    ["Product type: Climate projections", "Spatial coverage: Global"],
+    [-180, -90, 180, 90],
+    ["1850-01-01T00:00:00Z", "2100-12-31T00:00:00Z"],
+)
+
+
+def get_collections(*pages: list[dict[str, Any]]) -> catalogue.Collections:
+    for i, page in enumerate(pages):
+        links = []
+        if i + 1 < len(pages):
+            links.append({"rel": "next", "href": f"{DATASETS_URL}?page={i + 1}"})
+        responses.get(
+            f"{DATASETS_URL}?page={i}",
+            json={"collections": page, "links": links},
+            match=[responses.matchers.query_param_matcher({"page": str(i)})],
+        )
+    return catalogue.Collections.from_request(
+        "get",
+        f"{DATASETS_URL}?page=0",
+        headers={},
+        session=None,
+        retry_options={"maximum_tries": 1},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+
+
+@pytest.fixture
+@responses.activate
+def index(tmp_path: pathlib.Path) -> indexing.CollectionIndex:
+    index = indexing.CollectionIndex(str(tmp_path / "index.sqlite"))
+    assert index.refresh(get_collections([ERA5, CERRA], [CMIP6])) == 3
+    return index
+
+
+@pytest.mark.parametrize(
+    "kwargs,expected",
+    [
+        (
+            {},
+            [
+                "projections-cmip6",
+                "reanalysis-cerra-land",
+                "reanalysis-era5-single-levels",
+            ],
+        ),
+        ({"query": "reanalysis europe"}, ["reanalysis-cerra-land"]),
+        ({"query": "ERA5 (hourly"}, ["reanalysis-era5-single-levels"]),
+        (
+            {"keywords": ["Spatial coverage: Global", "Product type: Reanalysis"]},
+            ["reanalysis-era5-single-levels"],
+        ),
+        (
+            {"bbox": (100, -10, 110, 0)},
+            ["projections-cmip6", "reanalysis-era5-single-levels"],
+        ),
+        (
+            {"start": datetime.date(2022, 1, 1), "end": "2023-01-01"},
+            ["projections-cmip6", "reanalysis-era5-single-levels"],
+        ),
+        ({"end": "1900-01-01T00:00:00Z"}, ["projections-cmip6"]),
+        ({"limit": 1}, ["projections-cmip6"]),
+    ],
+)
+def test_indexing_search(
+    index: indexing.CollectionIndex, kwargs: dict[str, Any], expected: list[str]
+) -> None:
+    assert index.search(**kwargs) == expected
+
+
+@responses.activate
+def test_indexing_refresh(index: indexing.CollectionIndex) -> None:
+    assert index.refresh(get_collections([ERA5, CERRA], [CMIP6])) == 0
+
+    updated = {**CMIP6, "title": "CMIP6 projections", "updated": "2024-02-01"}
+    assert index.refresh(get_collections([ERA5], [updated])) == 2
+    assert len(index) == 2
+    assert index.get("projections-cmip6")["title"] == "CMIP6 projections"
+    assert index.search(query="projections cmip6") == ["projections-cmip6"]
+    assert index.search(query="europe") == []
+    with pytest.raises(KeyError):
+        index.get("reanalysis-cerra-land")
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import io
+
+from cads_api_client import reporting
+
+
+def test_reporting_format_size() -> None:
+    assert reporting.format_size(10) == "10.0 B"
+    assert reporting.format_size(3 << 20) == "3.0 MiB"
+    assert reporting.format_size(1 << 50) == "1024.0 TiB"
+
+
+def test_reporting_progress_aggregator() -> None:
+    stream = io.StringIO()
+    with reporting.ProgressAggregator(refresh_interval=3600, stream=stream) as progress:
+        job = progress.add_job()
+        job.set_state("downloading")
+        with job.progress_bar(total=2048, initial=0, desc="a.grib") as pbar:
+            pbar.update(1024)
+        # a retry of the same download replaces the previous progress
+        with job.progress_bar(total=2048, initial=1024, desc="a.grib") as pbar:
+            pbar.update(512)
+        progress.add_job()
+
+        summary = progress.summary()
+        assert summary.startswith("1.5 KiB / 2.0 KiB | ")
+        assert summary.endswith(
+            "1 pending, 0 processing, 1 downloading, 0 done, 0 failed"
+        )
+        # throttled: rendered once
+        assert stream.getvalue().count("\r") == 1
+    assert stream.getvalue().count("\r") == 2
+    assert stream.getvalue().endswith("\n")
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import concurrent.futures
+import pathlib
+import threading
+import time
+from typing import Any
+
+import pytest
+import responses
+
+from cads_api_client import ApiClient, singleflight
+
+API_URL = "http://localhost:8080/api"
+
+
+def test_singleflight_do() -> None:
+    flight: singleflight.SingleFlight[int] = singleflight.SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def func() -> int:
+        calls.append(1)
+        release.wait()
+        return len(calls)
+
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(flight.do, "key", func) for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert calls == [1]
+    assert sorted(results) == [(1, False), (1, True), (1, True), (1, True)]
+
+    assert flight.do("key", func) == (2, False)
+
+
+def test_singleflight_exception() -> None:
+    flight: singleflight.SingleFlight[int] = singleflight.SingleFlight()
+
+    def func() -> int:
+        raise ValueError("dummy")
+
+    with pytest.raises(ValueError, match="dummy"):
+        flight.do("key", func)
+
+
+@responses.activate
+def test_singleflight_retrieve(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> None:
+    responses.get(f"{API_URL}/catalogue/v1/messages", json={})
+    client = ApiClient(url=API_URL, key="dummy", maximum_tries=0)
+    release = threading.Event()
+    submissions = []
+
+    class DummyRemote:
+        def download(self, target: str | None = None) -> str:
+            release.wait()
+            assert target is not None
+            pathlib.Path(target).write_text("data")
+            return target
+
+    def submit(collection_id: str, **request: Any) -> DummyRemote:
+        submissions.append(request)
+        return DummyRemote()
+
+    monkeypatch.setattr(client, "submit", submit)
+    targets = [str(tmp_path / f"{i}.grib") for i in range(3)]
+    with concurrent.futures.ThreadPoolExecutor(3) as executor:
+        futures = [
+            executor.submit(
+                client.retrieve, "dummy", target=target, year=2020, variable=["t"]
+            )
+            for target in targets
+        ]
+        time.sleep(0.1)
+        release.set()
+        actual = [future.result() for future in futures]
+
+    assert len(submissions) == 1
+    assert actual == targets
+    assert all(pathlib.Path(target).read_text() == "data" for target in targets)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import pathlib
+from typing import Any
+
+import pytest
+import requests
+import responses
+
+from cads_api_client import batch, processing, reporting, splitting
+
+PROCESS_URL = "http://localhost:8080/api/retrieve/v1/processes/dummy"
+JOB_URL = "http://localhost:8080/api/retrieve/v1/jobs/{}"
+RESULTS_URL = "http://localhost:8080/api/retrieve/v1/jobs/{}/results"
+DATA_URL = "http://localhost:8080/data/{}.grib"
+
+
+def costing_callback(
+    request: requests.PreparedRequest,
+) -> tuple[int, dict[str, str], str]:
+    assert request.body is not None
+    inputs = json.loads(request.body)["inputs"]
+    cost = 1
+    for value in inputs.values():
+        cost *= len(value) if isinstance(value, list) else 1
+    return (200, {}, json.dumps({"id": "size", "cost": cost, "limit": 2}))
+
+
+@pytest.fixture
+@responses.activate
+def process() -> processing.Process:
+    responses.add(responses.GET, PROCESS_URL, json={"id": "dummy"})
+    return processing.Process.from_request(
+        "get",
+        PROCESS_URL,
+        headers={},
+        session=None,
+        retry_options={"maximum_tries": 1},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+
+
+@pytest.mark.parametrize(
+    "request_,expected",
+    [
+        (
+            {"variable": ["a", "b", "c"], "year": "2020"},
+            [
+                {"variable": ["a"], "year": "2020"},
+                {"variable": ["b", "c"], "year": "2020"},
+            ],
+        ),
+        (
+            {"year": ["2020", "2021"], "variable": ["a", "b"]},
+            [
+                {"year": ["2020"], "variable": ["a", "b"]},
+                {"year": ["2021"], "variable": ["a", "b"]},
+            ],
+        ),
+        (
+            {"date": "2020-01-01/2020-01-04"},
+            [{"date": "2020-01-01/2020-01-02"}, {"date": "2020-01-03/2020-01-04"}],
+        ),
+        ({"date": "2020-01-01/2020-01-01", "variable": "a"}, None),
+    ],
+)
+def test_splitting_bisect_request(
+    request_: dict[str, Any], expected: list[dict[str, Any]] | None
+) -> None:
+    assert splitting.bisect_request(request_) == expected
+
+
+@responses.activate
+def test_splitting_split(process: processing.Process) -> None:
+    costing = responses.add_callback(
+        responses.POST, f"{PROCESS_URL}/costing", callback=costing_callback
+    )
+    splitter = splitting.RequestSplitter(process)
+    actual = splitter.split(year=["2020", "2021"], variable=["a", "b", "c"])
+    assert actual == [
+        {"year": ["2020"], "variable": ["a"]},
+        {"year": ["2020"], "variable": ["b", "c"]},
+        {"year": ["2021"], "variable": ["a"]},
+        {"year": ["2021"], "variable": ["b", "c"]},
+    ]
+    assert costing.call_count == 7
+
+    splitter.split(year=["2020", "2021"], variable=["a", "b", "c"])
+    assert costing.call_count == 7
+
+
+@responses.activate
+def test_splitting_split_error(process: processing.Process) -> None:
+    responses.add_callback(
+        responses.POST, f"{PROCESS_URL}/costing", callback=costing_callback
+    )
+    splitter = splitting.RequestSplitter(process, split_keys=["year"])
+    with pytest.raises(splitting.SplitError, match="cannot split"):
+        splitter.split(year="2020", variable=["a", "b", "c"])
+
+
+@responses.activate
+def test_batch_retrieve_many(
+    process: processing.Process, tmp_path: pathlib.Path
+) -> None:
+    for uid in ("a", "b"):
+        job_json = {
+            "jobID": uid,
+            "status": "successful",
+            "links": [{"rel": "monitor", "href": JOB_URL.format(uid)}],
+        }
+        responses.post(
+            f"{PROCESS_URL}/execution",
+            json=job_json,
+            match=[responses.matchers.json_params_matcher({"inputs": {"v": uid}})],
+        )
+        responses.get(JOB_URL.format(uid), json=job_json)
+        responses.get(
+            RESULTS_URL.format(uid),
+            json={
+                "asset": {
+                    "value": {
+                        "type": "application/x-grib",
+                        "href": DATA_URL.format(uid),
+                        "file:size": 1,
+                    }
+                }
+            },
+        )
+        responses.head(DATA_URL.format(uid), headers={"content-length": "1"})
+        responses.get(DATA_URL.format(uid), body=uid)
+
+    responses.post(
+        f"{PROCESS_URL}/execution",
+        status=400,
+        json={"title": "invalid request"},
+        match=[responses.matchers.json_params_matcher({"inputs": {"v": "c"}})],
+    )
+
+    stream = io.StringIO()
+    progress = reporting.ProgressAggregator(refresh_interval=0, stream=stream)
+    actual = batch.retrieve_many(
+        process, [{"v": "a"}, {"v": "c"}, {"v": "b"}], str(tmp_path), progress=progress
+    )
+    assert actual[0] == batch.ManifestEntry({"v": "a"}, "a", str(tmp_path / "a-a.grib"))
+    assert actual[2] == batch.ManifestEntry({"v": "b"}, "b", str(tmp_path / "b-b.grib"))
+    assert (tmp_path / "b-b.grib").read_text() == "b"
+
+    assert not actual[1].ok
+    assert actual[1].target is None
+    assert isinstance(actual[1].error, requests.HTTPError)
+    assert progress.summary().startswith("2.0 B / 2.0 B")
+    assert progress.summary().endswith(
+        "0 pending, 0 processing, 0 downloading, 2 done, 1 failed"
+    )
+    assert "\r" in stream.getvalue()
+
+
+@responses.activate
+def test_batch_retrieve_many_postprocess(
+    process: processing.Process, tmp_path: pathlib.Path
+) -> None:
+    for uid in ("a", "b"):
+        job_json = {
+            "jobID": uid,
+            "status": "successful",
+            "links": [{"rel": "monitor", "href": JOB_URL.format(uid)}],
+        }
+        responses.post(
+            f"{PROCESS_URL}/execution",
+            json=job_json,
+            match=[responses.matchers.json_params_matcher({"inputs": {"v": uid}})],
+        )
+        responses.get(JOB_URL.format(uid), json=job_json)
+        responses.get(
+            RESULTS_URL.format(uid),
+            json={"asset": {"value": {"href": DATA_URL.format(uid), "file:size": 3}}},
+        )
+        responses.get(DATA_URL.format(uid), body=uid * 3)
+
+    actual = batch.retrieve_many(
+        process,
+        [{"v": "a"}, {"v": "b"}],
+        str(tmp_path),
+        postprocess=os.path.getsize,
+        postprocess_workers=1,
+        max_pending=1,
+    )
+    assert [entry.output for entry in actual] == [3, 3]
+    for entry in actual:
+        assert entry.ok
+        assert set(entry.timings) == {"processing", "download", "postprocess"}
+
+    actual = batch.retrieve_many(
+        process, [{"v": "a"}], str(tmp_path), postprocess=os.rmdir
+    )
+    assert actual[0].target == str(tmp_path / "a-a.grib")
+    assert isinstance(actual[0].error, NotADirectoryError)
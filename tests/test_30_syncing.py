@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import datetime
+import pathlib
+from typing import Any, Sequence
+
+import pytest
+import responses
+
+from cads_api_client import batch, catalogue, syncing
+
+COLLECTION_URL = "http://localhost:8080/api/catalogue/v1/collections/dummy"
+PROCESS_URL = "http://localhost:8080/api/retrieve/v1/processes/dummy"
+
+
+def get_collection(end: str) -> catalogue.Collection:
+    responses.get(
+        COLLECTION_URL,
+        json={
+            "id": "dummy",
+            "extent": {"temporal": {"interval": [["2020-01-01T00:00:00Z", end]]}},
+            "links": [{"rel": "retrieve", "href": PROCESS_URL}],
+        },
+    )
+    responses.get(PROCESS_URL, json={"id": "dummy"})
+    return catalogue.Collection.from_request(
+        "get",
+        COLLECTION_URL,
+        headers={},
+        session=None,
+        retry_options={"maximum_tries": 1},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+
+
+@pytest.mark.parametrize(
+    "split_ymd,expected",
+    [
+        (
+            False,
+            [
+                {"variable": "t", "date": "2020-01-30/2020-02-01"},
+                {"variable": "t", "date": "2020-02-03/2020-02-03"},
+            ],
+        ),
+        (
+            True,
+            [
+                {"variable": "t", "year": "2020", "month": "01", "day": ["30", "31"]},
+                {"variable": "t", "year": "2020", "month": "02", "day": ["01", "03"]},
+            ],
+        ),
+    ],
+)
+def test_syncing_date_requests(split_ymd: bool, expected: list[dict[str, Any]]) -> None:
+    dates = [
+        datetime.date(2020, 2, 3),
+        datetime.date(2020, 1, 30),
+        datetime.date(2020, 1, 31),
+        datetime.date(2020, 2, 1),
+    ]
+    actual = syncing.date_requests({"variable": "t"}, dates, split_ymd=split_ymd)
+    assert actual == expected
+
+
+@responses.activate
+def test_syncing_delta_sync(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> None:
+    submitted: list[dict[str, Any]] = []
+    failing: set[str] = set()
+
+    def retrieve_many(
+        process: Any,
+        request_list: Sequence[dict[str, Any]],
+        target_dir: str | None = None,
+        max_workers: int = 4,
+    ) -> list[batch.ManifestEntry]:
+        submitted.extend(request_list)
+        return [
+            batch.ManifestEntry(request, error=ValueError())
+            if request["date"] in failing
+            else batch.ManifestEntry(request, "uid", f"{request['date']}.grib")
+            for request in request_list
+        ]
+
+    monkeypatch.setattr(batch, "retrieve_many", retrieve_many)
+    request = {"variable": "t", "date": "2020-01-01/2020-01-03"}
+    sync = syncing.DeltaSync(
+        get_collection("2020-01-03T00:00:00Z"), request, str(tmp_path)
+    )
+    assert [entry.ok for entry in sync.sync()] == [True]
+    assert submitted == [{"variable": "t", "date": "2020-01-01/2020-01-03"}]
+    assert sync.sync() == []
+
+    # the collection grows, but the retrieval fails
+    submitted.clear()
+    failing.add("2020-01-04/2020-01-05")
+    sync.collection = get_collection("2020-01-05T00:00:00Z")
+    assert [entry.ok for entry in sync.sync()] == [False]
+    assert submitted == [{"variable": "t", "date": "2020-01-04/2020-01-05"}]
+
+    # failed dates are retried
+    submitted.clear()
+    failing.clear()
+    sync.collection = get_collection("2020-01-06T00:00:00Z")
+    assert sync.missing_dates() == [
+        datetime.date(2020, 1, 4),
+        datetime.date(2020, 1, 5),
+        datetime.date(2020, 1, 6),
+    ]
+    sync.sync()
+    assert submitted == [{"variable": "t", "date": "2020-01-04/2020-01-06"}]
+    assert sync.missing_dates() == []
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+import pathlib
+
+from cads_api_client import tuning
+
+MiB = 1 << 20
+
+
+def test_tuning_bandwidth_tuner() -> None:
+    tuner = tuning.BandwidthTuner(
+        tuning.RangeSettings(2, 8 * MiB), max_connections=16, interval=1
+    )
+    start = tuner._started
+    assert tuner.adjust(start + 0.5) == tuning.RangeSettings(2, 8 * MiB)
+
+    # throughput improves: double the connections
+    tuner.record(20 * MiB)
+    assert tuner.adjust(start + 1) == tuning.RangeSettings(4, 20 * MiB)
+    tuner.record(40 * MiB)
+    assert tuner.adjust(start + 2) == tuning.RangeSettings(8, 20 * MiB)
+
+    # saturated: back to the previous settings
+    tuner.record(41 * MiB)
+    assert tuner.adjust(start + 3) == tuning.RangeSettings(4, 40 * MiB)
+    assert tuner.settled
+    assert tuner.throughput == 40 * MiB
+    tuner.record(100 * MiB)
+    assert tuner.adjust(start + 4) == tuning.RangeSettings(4, 40 * MiB)
+
+
+def test_tuning_bandwidth_tuner_limits() -> None:
+    tuner = tuning.BandwidthTuner(
+        tuning.RangeSettings(2, 8 * MiB), max_connections=3, interval=1
+    )
+    start = tuner._started
+    tuner.record(1000)
+    assert tuner.adjust(start + 1) == tuning.RangeSettings(3, MiB)
+    tuner.record(10 * MiB)
+    tuner.adjust(start + 2)
+    assert tuner.settled
+
+    fixed = tuning.BandwidthTuner(tuning.RangeSettings(2, 8 * MiB), tune=False)
+    fixed.record(10 * MiB)
+    assert fixed.adjust(fixed._started + 10) == tuning.RangeSettings(2, 8 * MiB)
+
+
+def test_tuning_store(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "tuning.json"
+    store = tuning.TuningStore(str(path))
+    assert store.get("example.com") is None
+    store.record("example.com", tuning.RangeSettings(4, MiB), 10.0)
+    assert store.get("example.com") == tuning.RangeSettings(4, MiB)
+    assert json.loads(path.read_text())["example.com"]["throughput"] == 10.0
+
+    assert tuning.TuningStore(str(path)).get("example.com") == tuning.RangeSettings(
+        4, MiB
+    )
+    path.write_text("invalid")
+    assert tuning.TuningStore(str(path)).get("example.com") is None
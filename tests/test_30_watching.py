@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import requests
+import responses
+
+from cads_api_client import catalogue, watching
+
+CATALOGUE_URL = "http://localhost:8080/api/catalogue"
+COLLECTION_URL = f"{CATALOGUE_URL}/v1/collections/dummy"
+
+
+def collection_json(end: str) -> dict[str, object]:
+    return {
+        "id": "dummy",
+        "extent": {"temporal": {"interval": [["2020-01-01T00:00:00Z", end]]}},
+        "links": [],
+    }
+
+
+@responses.activate
+def test_watching_check() -> None:
+    api = catalogue.Catalogue(
+        CATALOGUE_URL,
+        headers={},
+        session=requests.Session(),
+        retry_options={"maximum_tries": 1},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+    watcher = watching.CatalogueWatcher(api, ["dummy"])
+    updated: list[catalogue.Collection] = []
+    watcher.add_callback(updated.append)
+
+    # first check records the version
+    responses.get(
+        COLLECTION_URL,
+        json=collection_json("2020-01-01T00:00:00Z"),
+        headers={"ETag": "a"},
+    )
+    assert watcher.poll() == []
+    assert "If-None-Match" not in responses.calls[-1].request.headers
+
+    # not modified
+    responses.replace(responses.GET, COLLECTION_URL, status=304)
+    assert watcher.poll() == []
+    assert responses.calls[-1].request.headers["If-None-Match"] == "a"
+
+    # new ETag, same content
+    responses.replace(
+        responses.GET,
+        COLLECTION_URL,
+        json=collection_json("2020-01-01T00:00:00Z"),
+        headers={"ETag": "b"},
+    )
+    assert watcher.poll() == []
+    assert updated == []
+
+    # new data
+    responses.replace(
+        responses.GET,
+        COLLECTION_URL,
+        json=collection_json("2020-01-02T00:00:00Z"),
+        headers={"ETag": "c"},
+    )
+    (collection,) = watcher.poll()
+    assert responses.calls[-1].request.headers["If-None-Match"] == "b"
+    assert updated == [collection]
+    assert collection.end_datetime is not None
+    assert collection.end_datetime.day == 2
+    assert "If-None-Match" not in collection.headers
@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import base64
+import functools
+import hashlib
+import io
+import json
+import os
+import pathlib
+import re
+import time
+import zipfile
+from typing import Any
+
+import pytest
+import requests
+import responses
+
+from cads_api_client import ApiClient, Results, processing, sinks, tuning
+
+RESULTS_URL = "http://localhost:8080/api/retrieve/v1/jobs/dummy/results"
+DATA_URL = "http://localhost:8080/data/dummy.grib"
+DATA = bytes(range(256)) * 40
+
+
+def get_results(size: int = len(DATA)) -> Results:
+    responses.get(
+        RESULTS_URL,
+        json={"asset": {"value": {"href": DATA_URL, "file:size": size}}},
+    )
+    return Results.from_request(
+        "get",
+        RESULTS_URL,
+        headers={},
+        session=None,
+        retry_options={"maximum_tries": 1},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+
+
+@responses.activate
+def test_streaming_iter_content() -> None:
+    results = get_results()
+    responses.get(DATA_URL, body=DATA)
+    chunks = list(results.iter_content(chunk_size=1000))
+    assert b"".join(chunks) == DATA
+    assert {len(chunk) for chunk in chunks[:-1]} == {1000}
+
+
+@responses.activate
+def test_streaming_iter_content_size_mismatch() -> None:
+    results = get_results(size=len(DATA) + 1)
+    responses.get(DATA_URL, body=DATA)
+    with pytest.raises(processing.DownloadError):
+        list(results.iter_content())
+
+
+@responses.activate
+def test_streaming_open() -> None:
+    results = get_results()
+    responses.get(DATA_URL, body=DATA)
+    with results.open(chunk_size=1000) as fp:
+        assert fp.read(10) == DATA[:10]
+        assert fp.readable()
+        assert not fp.seekable()
+        assert fp.read() == DATA[10:]
+        assert fp.read() == b""
+    assert fp.closed
+
+
+def range_callback(
+    request: requests.PreparedRequest, data: bytes = DATA
+) -> tuple[int, dict[str, str], bytes]:
+    match = re.fullmatch(r"bytes=(\d+)-(\d+)", request.headers["Range"])
+    assert match is not None
+    start, stop = int(match.group(1)), int(match.group(2)) + 1
+    return (206, {}, data[start:stop])
+
+
+@responses.activate
+def test_streaming_open_remote() -> None:
+    results = get_results()
+    responses.add_callback(responses.GET, DATA_URL, callback=range_callback)
+    with results.open_remote(block_size=1000, read_ahead=0) as fp:
+        assert fp.seekable()
+        fp.seek(2500)
+        assert fp.read(10) == DATA[2500:2510]
+        assert len(responses.calls) == 2
+        fp.seek(-10, io.SEEK_END)
+        assert fp.read() == DATA[-10:]
+        fp.seek(2000)
+        assert fp.read(1000) == DATA[2000:3000]
+        assert len(responses.calls) == 3  # cached block
+        fp.seek(0)
+        assert fp.read() == DATA
+
+
+@responses.activate
+def test_streaming_open_remote_read_ahead() -> None:
+    results = get_results()
+    responses.add_callback(responses.GET, DATA_URL, callback=range_callback)
+    with results.open_remote(block_size=1000, read_ahead=3) as fp:
+        assert fp.read(10) == DATA[:10]
+        time.sleep(0.1)
+        ranges = sorted(call.request.headers["Range"] for call in responses.calls[1:])
+        assert ranges == [f"bytes={i * 1000}-{i * 1000 + 999}" for i in range(4)]
+        assert fp.read() == DATA[10:]
+        assert len(responses.calls) == 1 + 11
+
+
+@responses.activate
+def test_streaming_open_remote_no_range_support() -> None:
+    results = get_results()
+    responses.get(DATA_URL, body=DATA)
+    with results.open_remote(block_size=1000) as fp:
+        fp.seek(5000)
+        assert fp.read(1000) == DATA[5000:6000]
+
+
+@responses.activate
+def test_streaming_zip_members(tmp_path: pathlib.Path) -> None:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("dir/", b"")
+        archive.writestr("dir/a.nc", b"a" * 100_000)
+        archive.writestr("b.nc", os.urandom(100_000))
+    data = buffer.getvalue()
+
+    results = get_results(len(data))
+    responses.add_callback(
+        responses.GET, DATA_URL, callback=functools.partial(range_callback, data=data)
+    )
+    members = results.list_zip_members()
+    assert [(member.name, member.size) for member in members] == [
+        ("dir/a.nc", 100_000),
+        ("b.nc", 100_000),
+    ]
+    assert members[0].compressed_size < 1_000
+
+    n_calls = len(responses.calls)
+    (path,) = results.extract_zip_members(
+        ["dir/a.nc"], target_dir=str(tmp_path), block_size=4096
+    )
+    assert pathlib.Path(path) == tmp_path / "dir" / "a.nc"
+    assert pathlib.Path(path).read_bytes() == b"a" * 100_000
+    # b.nc is not transferred
+    transferred = 0
+    for call in responses.calls[n_calls:]:
+        start, stop = call.request.headers["Range"][6:].split("-")
+        transferred += int(stop) + 1 - int(start)
+    assert transferred < 50_000
+
+
+@responses.activate
+def test_streaming_download_checksum(tmp_path: pathlib.Path) -> None:
+    sha256 = hashlib.sha256(DATA).hexdigest()
+    responses.get(
+        RESULTS_URL,
+        json={
+            "asset": {
+                "value": {
+                    "href": DATA_URL,
+                    "file:size": len(DATA),
+                    "file:checksum": f"1220{sha256}",
+                }
+            }
+        },
+    )
+    results = Results.from_request(
+        "get",
+        RESULTS_URL,
+        headers={},
+        session=None,
+        retry_options={"maximum_tries": 1},
+        request_options={},
+        download_options={},
+        sleep_max=120,
+        cleanup=False,
+        log_callback=None,
+    )
+    corrupted = DATA[:-1] + b"x"
+    target = str(tmp_path / "dummy.grib")
+
+    # a corrupted transfer is downloaded again
+    responses.get(DATA_URL, body=corrupted)
+    responses.get(DATA_URL, body=DATA)
+    assert results.download(target) == target
+    assert pathlib.Path(target).read_bytes() == DATA
+    assert results.digests == {"sha256": sha256}
+
+    # persistent corruption
+    responses.replace(responses.GET, DATA_URL, body=corrupted)
+    with pytest.raises(processing.DownloadError, match="checksum"):
+        results.download(target)
+    assert not os.path.exists(target)
+
+
+@responses.activate
+def test_streaming_download_header_checksum(tmp_path: pathlib.Path) -> None:
+    results = get_results()
+    md5 = base64.b64encode(hashlib.md5(b"other").digest()).decode()
+    responses.get(DATA_URL, body=DATA, headers={"Content-MD5": md5})
+    with pytest.raises(processing.DownloadError, match="checksum"):
+        results.download(str(tmp_path / "dummy.grib"))
+    assert len(responses.calls) == 1 + 2
+
+
+def open_range_callback(
+    request: requests.PreparedRequest,
+) -> tuple[int, dict[str, str], bytes]:
+    match = re.fullmatch(r"bytes=(\d+)-", request.headers.get("Range", "bytes=0-"))
+    assert match is not None
+    start = int(match.group(1))
+    return (206 if start else 200, {"ETag": "dummy"}, DATA[start:])
+
+
+@pytest.mark.parametrize(
+    "state,expected_range",
+    [
+        (
+            {"url": DATA_URL, "size": len(DATA), "etag": "dummy", "completed": 1000},
+            "bytes=1000-",
+        ),
+        (
+            {"url": DATA_URL, "size": len(DATA), "etag": "dummy", "completed": 9999},
+            "bytes=3000-",
+        ),
+        ({"url": "other", "size": len(DATA), "etag": "dummy", "completed": 1000}, None),
+    ],
+)
+@responses.activate
+def test_streaming_download_resume(
+    tmp_path: pathlib.Path, state: dict[str, Any], expected_range: str | None
+) -> None:
+    results = get_results()
+    responses.add_callback(responses.GET, DATA_URL, callback=open_range_callback)
+    target = tmp_path / "dummy.grib"
+    (tmp_path / "dummy.grib.part").write_bytes(DATA[:3000])
+    (tmp_path / "dummy.grib.part.json").write_text(json.dumps(state))
+
+    assert results.download(str(target), resume=True) == str(target)
+    assert target.read_bytes() == DATA
+    assert results.digests["sha256"] == hashlib.sha256(DATA).hexdigest()
+    assert os.listdir(tmp_path) == ["dummy.grib"]
+    request_headers = responses.calls[-1].request.headers
+    assert request_headers.get("Range") == expected_range
+    if expected_range is not None:
+        assert request_headers["If-Range"] == "dummy"
+
+
+@responses.activate
+def test_streaming_download_resume_interrupted(tmp_path: pathlib.Path) -> None:
+    results = get_results()
+    target = tmp_path / "dummy.grib"
+
+    def interrupted_callback(
+        request: requests.PreparedRequest,
+    ) -> tuple[int, dict[str, str], bytes]:
+        raise KeyboardInterrupt
+
+    responses.add_callback(responses.GET, DATA_URL, callback=interrupted_callback)
+    with pytest.raises(KeyboardInterrupt):
+        results.download(str(target), resume=True)
+    assert not target.exists()
+    state = json.loads((tmp_path / "dummy.grib.part.json").read_text())
+    assert state == {"url": DATA_URL, "size": len(DATA), "etag": None, "completed": 0}
+
+
+@responses.activate
+def test_streaming_download_ranges(tmp_path: pathlib.Path) -> None:
+    results = get_results()
+    responses.add_callback(responses.GET, DATA_URL, callback=range_callback)
+    target = str(tmp_path / "dummy.grib")
+    assert results.download_ranges(target, max_workers=3, part_size=1000) == target
+    assert pathlib.Path(target).read_bytes() == DATA
+    assert results.digests["sha256"] == hashlib.sha256(DATA).hexdigest()
+    ranges = sorted(call.request.headers["Range"] for call in responses.calls[1:])
+    assert len(ranges) == len(DATA) // 1000 + 1
+    assert "bytes=10000-10239" in ranges
+
+
+@responses.activate
+def test_streaming_download_ranges_no_range_support(tmp_path: pathlib.Path) -> None:
+    results = get_results()
+    responses.get(DATA_URL, body=DATA)
+    target = str(tmp_path / "dummy.grib")
+    assert results.download_ranges(target, max_workers=3, part_size=1000) == target
+    assert pathlib.Path(target).read_bytes() == DATA
+
+
+def test_streaming_mmap_sink(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "dummy.grib")
+    with sinks.MmapSink(path, 10) as sink:
+        assert os.path.getsize(path) == 10
+        sink.write_at(5, b"world")
+        sink.write_at(0, b"hello")
+        assert bytes(sink.view()) == b"helloworld"
+        with pytest.raises(ValueError):
+            sink.write_at(8, b"abc")
+    assert pathlib.Path(path).read_bytes() == b"helloworld"
+
+
+@responses.activate
+def test_streaming_download_to() -> None:
+    results = get_results()
+    responses.get(DATA_URL, body=DATA)
+    sink = sinks.MemorySink()
+    assert isinstance(sink, sinks.Sink)
+    results.download_to(sink)
+    assert sink.getvalue() == DATA
+    assert results.digests["sha256"] == hashlib.sha256(DATA).hexdigest()
+
+    md5 = base64.b64encode(hashlib.md5(b"other").digest()).decode()
+    responses.replace(responses.GET, DATA_URL, body=DATA, headers={"Content-MD5": md5})
+    with pytest.raises(processing.DownloadError, match="checksum"):
+        results.download_to(io.BytesIO())
+
+
+@responses.activate
+def test_streaming_download_url() -> None:
+    fsspec = pytest.importorskip("fsspec")
+    results = get_results()
+    responses.get(DATA_URL, body=DATA)
+    target = "memory://bucket/dummy.grib"
+    assert results.download(target) == target
+    with fsspec.open(target, "rb") as fp:
+        assert fp.read() == DATA
+
+
+def test_streaming_is_url() -> None:
+    assert sinks.is_url("s3://bucket/key")
+    assert sinks.is_url("memory://key")
+    assert not sinks.is_url("dir/dummy.grib")
+    assert not sinks.is_url("C:\\dummy.grib")
+
+
+@responses.activate
+def test_streaming_read() -> None:
+    results = get_results()
+    responses.get(DATA_URL, body=DATA)
+    with results.read() as fp:
+        assert isinstance(fp, io.BytesIO)
+        assert fp.read() == DATA
+
+    with results.read(max_memory=len(DATA) - 1) as fp:
+        assert not isinstance(fp, io.BytesIO)
+        assert fp.read() == DATA
+
+
+@responses.activate
+def test_streaming_retrieve_to_buffer(monkeypatch: pytest.MonkeyPatch) -> None:
+    responses.get("http://localhost:8080/api/catalogue/v1/messages", json={})
+    client = ApiClient(url="http://localhost:8080/api", key="dummy", maximum_tries=0)
+    results = get_results()
+    responses.get(DATA_URL, body=DATA)
+
+    class DummyRemote:
+        def make_results(self) -> Results:
+            return results
+
+    monkeypatch.setattr(client, "submit", lambda *args, **kwargs: DummyRemote())
+    buffer = client.retrieve("dummy", target=io.BytesIO(), year=2020)
+    assert buffer.getvalue() == DATA
+
+
+@responses.activate
+def test_streaming_download_ranges_tuning(tmp_path: pathlib.Path) -> None:
+    results = get_results()
+    store = tuning.TuningStore()
+    store.record("localhost:8080", tuning.RangeSettings(2, 1000), 0.0)
+    results.download_options["range_tuning"] = store
+    responses.add_callback(responses.GET, DATA_URL, callback=range_callback)
+    target = str(tmp_path / "dummy.grib")
+    assert results.download_ranges(target) == target
+    assert pathlib.Path(target).read_bytes() == DATA
+    assert len(responses.calls) == 1 + len(DATA) // 1000 + 1
+    assert store.get("localhost:8080") is not None